@@ -1,12 +1,20 @@
 import os
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
+from config.rate_limit_settings import RateLimitSettings
+
 
 class EmbeddingModelSettings(BaseModel):
     """Base settings for Embedding Model configurations."""
 
     default_model: str = Field(default="text-embedding-3-small")
+    batch_size: int = 64
+    encoding_format: Optional[str] = None
+    timeout: Optional[float] = None
+    max_retries: Optional[int] = None
+    rate_limit: RateLimitSettings = Field(default_factory=RateLimitSettings)
 
 
 class OpenAIEmbeddingModelSettings(EmbeddingModelSettings):
@@ -14,6 +22,7 @@ class OpenAIEmbeddingModelSettings(EmbeddingModelSettings):
 
     api_key: str = Field(default_factory=lambda: os.getenv("OPENAI_API_KEY"))
     default_model: str = Field(default="text-embedding-3-small")
+    encoding_format: Optional[str] = "base64"
 
 
 class OllamaEmbeddingModelSettings(EmbeddingModelSettings):
@@ -28,7 +37,68 @@ class BedrockEmbeddingModelSettings(EmbeddingModelSettings):
     """Bedrock specific settings extending EmbeddingModelSettings."""
 
     default_model: str = Field(default="amazon.titan-embed-text-v2:0")
+    batch_size: int = 1
     access_key: str = Field(default_factory=lambda: os.getenv("AWS_ACCESS_KEY_ID"))
     secret_key: str = Field(default_factory=lambda: os.getenv("AWS_SECRET_ACCESS_KEY"))
     session_token: str = Field(default_factory=lambda: os.getenv("AWS_SESSION_TOKEN"))
     region: str = Field(default_factory=lambda: os.getenv("AWS_DEFAULT_REGION"))
+
+
+class StubEmbeddingModelSettings(EmbeddingModelSettings):
+    """Settings for the local stub embedding model used in tests and development."""
+
+    default_model: str = Field(default="stub-embedding")
+    dimensions: int = 1024
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    # Effectively unbounded, so load tests measure the service rather than the limiter
+    rate_limit: RateLimitSettings = Field(
+        default_factory=lambda: RateLimitSettings(
+            initial_concurrency=1024, max_concurrency=1024
+        )
+    )
+
+
+class OnnxEmbeddingModelSettings(EmbeddingModelSettings):
+    """Settings for a local ONNX sentence-embedding model run in-process on the CPU."""
+
+    default_model: str = Field(default="mxbai-embed-large-v1")
+    model_path: str = Field(default_factory=lambda: os.getenv("ONNX_EMBEDDING_MODEL_PATH"))
+    tokenizer_path: Optional[str] = Field(
+        default_factory=lambda: os.getenv("ONNX_EMBEDDING_TOKENIZER_PATH")
+    )
+    max_length: int = 256
+    normalize: bool = True
+    # How the model was trained to pool token embeddings: "cls" or "mean"
+    pooling: Literal["cls", "mean"] = "cls"
+    intra_op_threads: int = 0
+    max_batch_size: int = 32
+    max_wait_ms: float = 0.0
+    num_workers: int = 2
+    rate_limit: RateLimitSettings = Field(
+        default_factory=lambda: RateLimitSettings(
+            initial_concurrency=64, max_concurrency=256
+        )
+    )
+
+
+class ResilientEmbeddingModelSettings(BaseModel):
+    """Settings for deadline-bound, hedged embedding calls with provider fallback."""
+
+    providers: List[str] = Field(
+        default_factory=lambda: os.getenv(
+            "RESILIENT_EMBEDDING_MODEL_PROVIDERS", "bedrock_embedding_model"
+        ).split(",")
+    )
+    timeout: float = 5.0
+    batch_timeout: float = 60.0
+    hedge_percentile: float = 95.0
+    hedge_min_delay: float = 0.05
+    hedge_min_samples: int = 20
+    latency_window: int = 500
+    breaker_error_rate: float = 0.5
+    breaker_min_calls: int = 10
+    breaker_window: int = 50
+    breaker_cooldown: float = 30.0
+    max_workers: int = 8
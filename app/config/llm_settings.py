@@ -3,6 +3,8 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from config.rate_limit_settings import RateLimitSettings
+
 
 class LLMSettings(BaseModel):
     """Base settings for Language Model configurations."""
@@ -10,6 +12,7 @@ class LLMSettings(BaseModel):
     temperature: float = 0.0
     max_tokens: Optional[int] = None
     max_retries: int = 3
+    rate_limit: RateLimitSettings = Field(default_factory=RateLimitSettings)
 
 
 class OpenAISettings(LLMSettings):
@@ -36,3 +39,18 @@ class BedrockSettings(LLMSettings):
     region: str = Field(default_factory=lambda: os.getenv("AWS_DEFAULT_REGION"))
     default_model: str = Field(default="anthropic.claude-3-5-sonnet-20241022-v2:0")
     max_tokens: Optional[int] = 1024
+
+
+class StubSettings(LLMSettings):
+    """Settings for the local stub LLM used in tests and development."""
+
+    default_model: str = Field(default="stub-llm")
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    # High enough that calls never queue on the rate limiter
+    rate_limit: RateLimitSettings = Field(
+        default_factory=lambda: RateLimitSettings(
+            initial_concurrency=1024, max_concurrency=1024
+        )
+    )
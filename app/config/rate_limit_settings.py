@@ -0,0 +1,18 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class RateLimitSettings(BaseModel):
+    """Rate limit and adaptive concurrency settings for a model provider."""
+
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    initial_concurrency: int = 4
+    min_concurrency: int = 1
+    max_concurrency: int = 32
+    decrease_factor: float = 0.5
+    decrease_cooldown: float = 1.0
+    max_retries: int = 5
+    initial_backoff: float = 1.0
+    max_backoff: float = 60.0
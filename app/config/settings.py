@@ -2,6 +2,7 @@ import logging
 import os
 from datetime import timedelta
 from functools import lru_cache
+from typing import List, Optional
 
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
@@ -9,9 +10,17 @@ from pydantic import BaseModel, Field
 from config.embedding_model_settings import (
     BedrockEmbeddingModelSettings,
     OllamaEmbeddingModelSettings,
+    OnnxEmbeddingModelSettings,
     OpenAIEmbeddingModelSettings,
+    ResilientEmbeddingModelSettings,
+    StubEmbeddingModelSettings,
+)
+from config.llm_settings import (
+    BedrockSettings,
+    OllamaSettings,
+    OpenAISettings,
+    StubSettings,
 )
-from config.llm_settings import BedrockSettings, OllamaSettings, OpenAISettings
 
 load_dotenv(dotenv_path="./.env")
 
@@ -27,6 +36,17 @@ class DatabaseSettings(BaseModel):
     """Database connection settings."""
 
     service_url: str = Field(default_factory=lambda: os.getenv("TIMESCALE_SERVICE_URL"))
+    replica_urls: List[str] = Field(
+        default_factory=lambda: [
+            url.strip()
+            for url in os.getenv("TIMESCALE_REPLICA_URLS", "").split(",")
+            if url.strip()
+        ]
+    )
+    max_db_connections: int = 10
+    connect_timeout: int = 5
+    replica_health_check_interval: float = 30.0
+    read_your_writes_window: float = 0.0
 
 
 class VectorStoreSettings(BaseModel):
@@ -35,6 +55,59 @@ class VectorStoreSettings(BaseModel):
     table_name: str = "embeddings"
     embedding_dimensions: int = 1024
     time_partition_interval: timedelta = timedelta(days=7)
+    adaptive_overfetch_factor: int = 4
+    adaptive_max_distance: float = 0.6
+    adaptive_max_gap: float = 0.15
+    recency_tier_partitions: List[int] = Field(default_factory=lambda: [1, 4, 13])
+    # None: the search limit
+    recency_min_results: Optional[int] = None
+    recency_weight: float = 0.0
+    recency_half_life: timedelta = timedelta(days=30)
+    target_partition_bytes: int = 1024**3
+
+
+class ChunkerSettings(BaseModel):
+    """Settings for splitting long-form documents into chunks."""
+
+    chunk_size: int = 256
+    chunk_overlap: int = 32
+    read_size: int = 1024 * 1024
+    batch_size: int = 64
+    max_batches_in_flight: int = 4
+
+
+class DeduplicationSettings(BaseModel):
+    """Settings for near-duplicate detection at ingestion time."""
+
+    enabled: bool = True
+    shingle_size: int = 3
+    num_permutations: int = 128
+    bands: int = 32
+    jaccard_threshold: float = 0.8
+    cosine_threshold: float = 0.97
+    block_size: int = 1024
+    seed: int = 42
+    report_path: str = Field(
+        default_factory=lambda: os.getenv("DEDUPLICATION_REPORT_PATH")
+        or "deduplication_report.json"
+    )
+
+
+class ServiceSettings(BaseModel):
+    """Settings for the retrieval and answer HTTP service."""
+
+    host: str = "0.0.0.0"
+    port: int = 8000
+    embedding_model_client: str = Field(
+        default_factory=lambda: os.getenv(
+            "EMBEDDING_MODEL_CLIENT", "bedrock_embedding_model"
+        )
+    )
+    llm_client: str = Field(default_factory=lambda: os.getenv("LLM_CLIENT", "bedrock"))
+    max_workers: int = 8
+    max_queued_requests: int = 32
+    request_timeout: float = 30.0
+    retry_after: int = 1
 
 
 class Settings(BaseModel):
@@ -43,8 +116,12 @@ class Settings(BaseModel):
     openai: OpenAISettings = Field(default_factory=OpenAISettings)
     llama: OllamaSettings = Field(default_factory=OllamaSettings)
     bedrock: BedrockSettings = Field(default_factory=BedrockSettings)
+    stub: StubSettings = Field(default_factory=StubSettings)
     database: DatabaseSettings = Field(default_factory=DatabaseSettings)
     vector_store: VectorStoreSettings = Field(default_factory=VectorStoreSettings)
+    deduplication: DeduplicationSettings = Field(default_factory=DeduplicationSettings)
+    chunker: ChunkerSettings = Field(default_factory=ChunkerSettings)
+    service: ServiceSettings = Field(default_factory=ServiceSettings)
     openai_embedding_model: OpenAIEmbeddingModelSettings = Field(
         default_factory=OpenAIEmbeddingModelSettings
     )
@@ -54,6 +131,15 @@ class Settings(BaseModel):
     bedrock_embedding_model: BedrockEmbeddingModelSettings = Field(
         default_factory=BedrockEmbeddingModelSettings
     )
+    stub_embedding_model: StubEmbeddingModelSettings = Field(
+        default_factory=StubEmbeddingModelSettings
+    )
+    onnx_embedding_model: OnnxEmbeddingModelSettings = Field(
+        default_factory=OnnxEmbeddingModelSettings
+    )
+    resilient_embedding_model: ResilientEmbeddingModelSettings = Field(
+        default_factory=ResilientEmbeddingModelSettings
+    )
 
 
 @lru_cache()
@@ -0,0 +1,280 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, TypeVar
+
+import pgvector.psycopg2
+import psycopg2
+import psycopg2.extras
+import psycopg2.pool
+from config.settings import DatabaseSettings, VectorStoreSettings
+from timescale_vector import client
+
+T = TypeVar("T")
+
+# Errors that indicate the server or the connection is unusable, as opposed to
+# errors caused by the query itself.
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+
+class _Pool:
+    """A connection pool and the number of connections checked out of it."""
+
+    def __init__(self, pool: psycopg2.pool.ThreadedConnectionPool):
+        self.pool = pool
+        self.in_use = 0
+        self.retired = False
+
+
+class PooledSync(client.Sync):
+    """
+    A Timescale Vector client that can be shared between threads.
+
+    The stock client uses a SimpleConnectionPool, which isn't thread-safe and raises
+    PoolError when all connections are in use. This one uses a ThreadedConnectionPool
+    behind a semaphore of `max_db_connections`, so callers wait for a free connection
+    instead. `reset` swaps in a new pool; connections still in use are returned to
+    the old one, which is closed once they have all come back.
+    """
+
+    def __init__(self, *args, connect_timeout: Optional[int] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connect_timeout = connect_timeout
+        self._pool_lock = threading.Lock()
+        self._current: Optional[_Pool] = None
+        self._slots = threading.BoundedSemaphore(self.max_db_connections)
+
+    def _acquire_pool(self) -> _Pool:
+        with self._pool_lock:
+            if self._current is None:
+                self._current = _Pool(
+                    psycopg2.pool.ThreadedConnectionPool(
+                        1,
+                        self.max_db_connections,
+                        dsn=self.service_url,
+                        cursor_factory=psycopg2.extras.DictCursor,
+                        connect_timeout=self.connect_timeout,
+                    )
+                )
+            self._current.in_use += 1
+            return self._current
+
+    def _release_pool(self, pool: _Pool, connection) -> None:
+        with self._pool_lock:
+            pool.in_use -= 1
+            pool.pool.putconn(connection, close=pool.retired)
+            if pool.retired and pool.in_use == 0:
+                pool.pool.closeall()
+
+    @contextmanager
+    def connect(self) -> Iterator:
+        """
+        Check out a connection, waiting while all `max_db_connections` are in use.
+        The transaction is committed when the block exits without an error.
+        """
+        with self._slots:
+            pool = self._acquire_pool()
+            try:
+                connection = pool.pool.getconn()
+            except BaseException:
+                with self._pool_lock:
+                    pool.in_use -= 1
+                    if pool.retired and pool.in_use == 0:
+                        pool.pool.closeall()
+                raise
+            try:
+                pgvector.psycopg2.register_vector(connection)
+                yield connection
+                connection.commit()
+            finally:
+                self._release_pool(pool, connection)
+
+    def reset(self) -> None:
+        """Replace the connection pool, closing the old one once its connections are returned."""
+        with self._pool_lock:
+            old, self._current = self._current, None
+            if old is None:
+                return
+            old.retired = True
+            if old.in_use == 0:
+                old.pool.closeall()
+
+    def close(self) -> None:
+        self.reset()
+
+
+class ReplicaState:
+    """Book-keeping for a single read replica."""
+
+    def __init__(self, service_url: str, vec_client: PooledSync):
+        self.service_url = service_url
+        self.vec_client = vec_client
+        self.in_flight = 0
+        self.healthy = True
+        self.next_check_at = 0.0
+
+
+class ConnectionRouter:
+    """Route vector operations between a primary database and its read replicas.
+
+    Writes always go to the primary. Reads go to the healthy replica with the
+    fewest in-flight operations, falling back to the primary when no replica is
+    configured or available. Every client keeps its own thread-safe connection pool.
+    """
+
+    def __init__(
+        self,
+        database_settings: DatabaseSettings,
+        vector_settings: VectorStoreSettings,
+    ):
+        self.database_settings = database_settings
+        self.vector_settings = vector_settings
+        self.primary = self._create_client(database_settings.service_url)
+        self.replicas: List[ReplicaState] = [
+            ReplicaState(url, self._create_client(url))
+            for url in database_settings.replica_urls
+        ]
+        self._lock = threading.Lock()
+        self._last_write_at: Optional[float] = None
+        self._next_replica = 0
+
+    def _create_client(self, service_url: str) -> PooledSync:
+        """Create a pooled Timescale Vector client for the given database URL."""
+        return PooledSync(
+            service_url,
+            self.vector_settings.table_name,
+            self.vector_settings.embedding_dimensions,
+            time_partition_interval=self.vector_settings.time_partition_interval,
+            max_db_connections=self.database_settings.max_db_connections,
+            connect_timeout=self.database_settings.connect_timeout,
+        )
+
+    def write(self, operation: Callable[[client.Sync], T]) -> T:
+        """
+        Run a write operation against the primary.
+
+        Args:
+            operation: A callable receiving the primary client.
+
+        Returns:
+            The result of the operation.
+        """
+        try:
+            return operation(self.primary)
+        finally:
+            with self._lock:
+                self._last_write_at = time.monotonic()
+
+    def read(self, operation: Callable[[client.Sync], T]) -> T:
+        """
+        Run a read operation against the least-loaded healthy replica.
+
+        The primary is used instead when there are no healthy replicas, or when
+        the last write happened within the configured read-your-writes window.
+        If a replica fails with a connection error it is marked unhealthy and the
+        operation is retried once on the primary.
+
+        Args:
+            operation: A callable receiving the selected client.
+
+        Returns:
+            The result of the operation.
+        """
+        replica = self._acquire_replica()
+        if replica is None:
+            return operation(self.primary)
+
+        try:
+            return operation(replica.vec_client)
+        except CONNECTION_ERRORS as e:
+            self._mark_unhealthy(replica, e)
+            return operation(self.primary)
+        finally:
+            with self._lock:
+                replica.in_flight -= 1
+
+    def _within_read_your_writes_window(self) -> bool:
+        window = self.database_settings.read_your_writes_window
+        return (
+            window > 0
+            and self._last_write_at is not None
+            and time.monotonic() - self._last_write_at < window
+        )
+
+    def _acquire_replica(self) -> Optional[ReplicaState]:
+        """Pick the least-loaded healthy replica and reserve a slot on it."""
+        if not self.replicas:
+            return None
+
+        with self._lock:
+            if self._within_read_your_writes_window():
+                return None
+            now = time.monotonic()
+            due = [r for r in self.replicas if not r.healthy and r.next_check_at <= now]
+            for replica in due:
+                # Claim the probe so concurrent readers don't all check at once.
+                replica.next_check_at = (
+                    now + self.database_settings.replica_health_check_interval
+                )
+
+        # Probe in the background so a dead replica can't stall this read.
+        for replica in due:
+            threading.Thread(
+                target=self._check_health, args=(replica,), daemon=True
+            ).start()
+
+        with self._lock:
+            healthy = [r for r in self.replicas if r.healthy]
+            if not healthy:
+                return None
+            # Rotate the starting point so ties are spread across replicas.
+            self._next_replica = (self._next_replica + 1) % len(healthy)
+            rotated = healthy[self._next_replica :] + healthy[: self._next_replica]
+            replica = min(rotated, key=lambda r: r.in_flight)
+            replica.in_flight += 1
+            return replica
+
+    def _check_health(self, replica: ReplicaState) -> None:
+        """Probe an unhealthy replica and return it to rotation if it responds."""
+        try:
+            with replica.vec_client.connect() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+        except CONNECTION_ERRORS as e:
+            self._reset_pool(replica)
+            logging.warning(f"Replica {self._host(replica)} still unhealthy: {e}")
+            return
+
+        with self._lock:
+            replica.healthy = True
+        logging.info(f"Replica {self._host(replica)} is healthy again")
+
+    def _mark_unhealthy(self, replica: ReplicaState, error: Exception) -> None:
+        with self._lock:
+            replica.healthy = False
+            replica.next_check_at = (
+                time.monotonic() + self.database_settings.replica_health_check_interval
+            )
+        self._reset_pool(replica)
+        logging.warning(
+            f"Replica {self._host(replica)} marked unhealthy, falling back to primary: {error}"
+        )
+
+    @staticmethod
+    def _reset_pool(replica: ReplicaState) -> None:
+        """Swap in a new pool so a recovered replica gets fresh connections."""
+        try:
+            replica.vec_client.reset()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _host(replica: ReplicaState) -> str:
+        return replica.service_url.rsplit("@", 1)[-1]
+
+    def close(self) -> None:
+        """Close the connection pools of the primary and all replicas."""
+        self.primary.close()
+        for replica in self.replicas:
+            replica.vec_client.close()
@@ -0,0 +1,63 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Union
+
+####################
+# Helpers for the time partitioning of the vector table.
+# Records are partitioned on the time encoded in their UUID v1 IDs, so a search
+# restricted to a recent time window only has to scan the newest chunks.
+####################
+
+# Offset between the UUID epoch (1582-10-15) and the Unix epoch, in 100 ns intervals
+UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+PARTITION_INTERVALS = [
+    timedelta(hours=1),
+    timedelta(hours=6),
+    timedelta(hours=12),
+    timedelta(days=1),
+    timedelta(days=2),
+    timedelta(days=7),
+    timedelta(days=14),
+    timedelta(days=28),
+    timedelta(days=91),
+    timedelta(days=182),
+    timedelta(days=364),
+]
+
+
+def uuid_time(record_id: Union[str, uuid.UUID]) -> datetime:
+    """The UTC creation time encoded in a UUID v1 record ID."""
+    if not isinstance(record_id, uuid.UUID):
+        record_id = uuid.UUID(str(record_id))
+    timestamp = (record_id.time - UUID_EPOCH_OFFSET) / 1e7
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+def recommend_partition_interval(
+    rows_per_day: float,
+    bytes_per_row: float,
+    target_partition_bytes: int,
+) -> timedelta:
+    """
+    Pick a partition (chunk) interval so each partition holds about `target_partition_bytes`.
+
+    The ideal interval is rounded down to a whole number of hours, days or weeks from
+    PARTITION_INTERVALS, so partitions stay at or below the target size.
+
+    Args:
+        rows_per_day: The observed ingest rate.
+        bytes_per_row: The average size of a row, including its embedding.
+        target_partition_bytes: The desired size of a partition. Timescale recommends
+            that the most recent chunks, including their indexes, fit in about 25% of
+            the database's memory.
+
+    Returns:
+        The recommended interval, between the smallest and largest of PARTITION_INTERVALS.
+    """
+    if rows_per_day <= 0 or bytes_per_row <= 0:
+        return PARTITION_INTERVALS[-1]
+
+    ideal = timedelta(days=target_partition_bytes / (rows_per_day * bytes_per_row))
+    candidates = [interval for interval in PARTITION_INTERVALS if interval <= ideal]
+    return candidates[-1] if candidates else PARTITION_INTERVALS[0]
@@ -0,0 +1,103 @@
+import io
+import json
+import struct
+import uuid
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+# Header of the PostgreSQL binary COPY format: signature, flags and header extension length.
+COPY_BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+COPY_BINARY_TRAILER = struct.pack("!h", -1)
+COPY_COLUMNS = ("id", "metadata", "contents", "embedding")
+JSONB_VERSION = b"\x01"
+
+
+@dataclass
+class RecordBatch:
+    """
+    A columnar batch of records for the vector store.
+
+    IDs, contents and metadata are kept as plain lists, while the embeddings are
+    held in a single contiguous 2-D float32 array with one row per record. This
+    avoids boxing every vector component as a Python float.
+    """
+
+    ids: List[str]
+    contents: List[Optional[str]]
+    metadata: List[dict]
+    embeddings: np.ndarray
+
+    def __post_init__(self):
+        self.embeddings = np.ascontiguousarray(self.embeddings, dtype=np.float32)
+        if self.embeddings.ndim != 2:
+            raise ValueError(
+                f"Embeddings must be a 2-D array, got {self.embeddings.ndim} dimensions"
+            )
+        lengths = {len(self.ids), len(self.contents), len(self.metadata), len(self.embeddings)}
+        if len(lengths) != 1:
+            raise ValueError(
+                "ids, contents, metadata and embeddings must all have the same length"
+            )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dimensions(self) -> int:
+        return self.embeddings.shape[1]
+
+    def take(self, indices: Sequence[int]) -> "RecordBatch":
+        """Return a new RecordBatch with only the records at the given positions."""
+        return RecordBatch(
+            ids=[self.ids[i] for i in indices],
+            contents=[self.contents[i] for i in indices],
+            metadata=[self.metadata[i] for i in indices],
+            embeddings=self.embeddings[np.asarray(indices, dtype=np.intp)],
+        )
+
+    def to_copy_binary(self) -> io.BytesIO:
+        """
+        Serialize the batch in PostgreSQL's binary COPY format.
+
+        Columns are written in COPY_COLUMNS order. The embedding column uses
+        pgvector's binary representation (dimension, unused, big-endian float4s),
+        which is produced for the whole batch with a single NumPy conversion.
+        Contents of None, e.g. from a snapshot of rows without contents, are
+        written as NULL.
+        """
+        dim = self.dimensions
+        vector_dtype = np.dtype(
+            [("length", ">i4"), ("dim", ">i2"), ("unused", ">i2"), ("values", ">f4", (dim,))]
+        )
+        vectors = np.empty(len(self), dtype=vector_dtype)
+        vectors["length"] = 4 + 4 * dim
+        vectors["dim"] = dim
+        vectors["unused"] = 0
+        vectors["values"] = self.embeddings
+        vector_bytes = vectors.tobytes()
+        stride = vector_dtype.itemsize
+
+        buffer = io.BytesIO()
+        buffer.write(COPY_BINARY_HEADER)
+        field_count = struct.pack("!h", len(COPY_COLUMNS))
+        for i, (record_id, metadata, contents) in enumerate(
+            zip(self.ids, self.metadata, self.contents)
+        ):
+            metadata_bytes = JSONB_VERSION + json.dumps(metadata).encode("utf-8")
+            buffer.write(field_count)
+            buffer.write(struct.pack("!i", 16))
+            buffer.write(uuid.UUID(str(record_id)).bytes)
+            buffer.write(struct.pack("!i", len(metadata_bytes)))
+            buffer.write(metadata_bytes)
+            if contents is None:
+                buffer.write(struct.pack("!i", -1))
+            else:
+                contents_bytes = contents.encode("utf-8")
+                buffer.write(struct.pack("!i", len(contents_bytes)))
+                buffer.write(contents_bytes)
+            buffer.write(vector_bytes[i * stride : (i + 1) * stride])
+        buffer.write(COPY_BINARY_TRAILER)
+        buffer.seek(0)
+        return buffer
@@ -0,0 +1,200 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from database.record_batch import RecordBatch
+from database.vector_store import VectorStore
+from psycopg2 import sql
+from timescale_vector import client
+
+####################
+# Snapshots of the vector table as columnar files.
+# Files ending in .parquet are written as Parquet; anything else is written as an
+# Arrow IPC file, which can be memory-mapped on import without copying.
+# IDs are kept as-is, so the time encoded in the UUID v1 IDs survives a round trip.
+####################
+
+
+def snapshot_schema(dimensions: int, table_name: str) -> pa.Schema:
+    """The Arrow schema of a snapshot of a table with the given embedding dimensions."""
+    return pa.schema(
+        [
+            pa.field("id", pa.string(), nullable=False),
+            pa.field("metadata", pa.string()),
+            pa.field("contents", pa.string()),
+            pa.field("embedding", pa.list_(pa.float32(), dimensions), nullable=False),
+        ],
+        metadata={
+            "table_name": table_name,
+            "embedding_dimensions": str(dimensions),
+            "exported_at": datetime.now().isoformat(),
+        },
+    )
+
+
+def _is_parquet(path: Path) -> bool:
+    return path.suffix.lower() == ".parquet"
+
+
+def export_snapshot(
+    vec: VectorStore,
+    path: str,
+    batch_size: int = 10_000,
+    from_replica: bool = False,
+) -> int:
+    """
+    Stream the vector table to a Parquet or Arrow file.
+
+    Rows are read with a server-side cursor, one batch at a time, with the
+    embeddings fetched in pgvector's binary format and decoded with NumPy.
+
+    Args:
+        vec: The VectorStore to export from.
+        path: The file to write.
+        batch_size: The number of rows per batch.
+        from_replica: Read from a replica instead of the primary. This takes load
+            off the primary, but a lagging replica can miss recently written rows.
+
+    Returns:
+        The number of rows exported.
+    """
+    if from_replica:
+        return vec.router.read(
+            lambda vec_client: _export(vec, vec_client, Path(path), batch_size)
+        )
+    return _export(vec, vec.router.primary, Path(path), batch_size)
+
+
+def _export(vec: VectorStore, vec_client: client.Sync, path: Path, batch_size: int) -> int:
+    table_name = vec.vector_settings.table_name
+    dimensions = vec.vector_settings.embedding_dimensions
+    schema = snapshot_schema(dimensions, table_name)
+    query = sql.SQL(
+        "SELECT id::text, metadata::text, contents, vector_send(embedding) FROM {table}"
+    ).format(table=sql.Identifier(table_name))
+
+    start_time = time.time()
+    total = skipped = 0
+    with ExitStack() as stack:
+        if _is_parquet(path):
+            writer = stack.enter_context(
+                pq.ParquetWriter(path, schema, compression="zstd")
+            )
+        else:
+            sink = stack.enter_context(pa.OSFile(str(path), "wb"))
+            writer = stack.enter_context(pa.ipc.new_file(sink, schema))
+        with vec_client.connect() as conn:
+            with conn.cursor(name="snapshot_export") as cur:
+                cur.itersize = batch_size
+                cur.execute(query)
+                while rows := cur.fetchmany(batch_size):
+                    # A row without an embedding can't be restored without re-embedding it
+                    embedded = [row for row in rows if row[3] is not None]
+                    skipped += len(rows) - len(embedded)
+                    if embedded:
+                        writer.write_batch(_rows_to_arrow(embedded, schema, dimensions))
+                    total += len(embedded)
+                    logging.info(f"Exported {total} records")
+
+    if skipped:
+        logging.warning(f"Skipped {skipped} records without an embedding")
+    elapsed_time = time.time() - start_time
+    logging.info(
+        f"Exported {total} records from {table_name} to {path} in {elapsed_time:.3f} seconds"
+    )
+    return total
+
+
+def _rows_to_arrow(rows, schema: pa.Schema, dimensions: int) -> pa.RecordBatch:
+    # vector_send output is a 2-byte dimension, 2 unused bytes, then big-endian float4s.
+    vectors = b"".join(bytes(row[3])[4:] for row in rows)
+    embeddings = np.frombuffer(vectors, dtype=">f4").astype(np.float32)
+    return pa.record_batch(
+        [
+            pa.array([row[0] for row in rows], pa.string()),
+            pa.array([row[1] for row in rows], pa.string()),
+            pa.array([row[2] for row in rows], pa.string()),
+            pa.FixedSizeListArray.from_arrays(pa.array(embeddings), dimensions),
+        ],
+        schema=schema,
+    )
+
+
+def _read_batches(path: Path, batch_size: int) -> Iterator[pa.RecordBatch]:
+    if _is_parquet(path):
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        yield from parquet_file.iter_batches(batch_size=batch_size)
+        return
+
+    reader = pa.ipc.open_file(pa.memory_map(str(path), "r"))
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        for start in range(0, batch.num_rows, batch_size):
+            yield batch.slice(start, batch_size)
+
+
+def _arrow_to_record_batch(batch: pa.RecordBatch, dimensions: int) -> RecordBatch:
+    embedding = batch.column("embedding")
+    if embedding.type.list_size != dimensions:
+        raise ValueError(
+            f"Snapshot has {embedding.type.list_size} dimensions, "
+            f"the vector store expects {dimensions}"
+        )
+    return RecordBatch(
+        ids=batch.column("id").to_pylist(),
+        contents=batch.column("contents").to_pylist(),
+        metadata=[json.loads(m) if m else {} for m in batch.column("metadata").to_pylist()],
+        embeddings=embedding.flatten().to_numpy().reshape(-1, dimensions),
+    )
+
+
+def import_snapshot(
+    vec: VectorStore,
+    path: str,
+    batch_size: int = 10_000,
+    build_index: bool = True,
+) -> int:
+    """
+    Bulk-load a Parquet or Arrow snapshot into the vector table.
+
+    The file is memory-mapped and loaded batch by batch with a binary COPY. The
+    embedding index is dropped before loading and, if `build_index` is set, rebuilt
+    once at the end, which is much faster than maintaining it during the load.
+
+    Args:
+        vec: The VectorStore to load into.
+        path: The snapshot file to read.
+        batch_size: The number of rows per batch.
+        build_index: Whether to build the DiskANN index after loading.
+
+    Returns:
+        The number of rows read from the snapshot.
+    """
+    path = Path(path)
+    dimensions = vec.vector_settings.embedding_dimensions
+    start_time = time.time()
+
+    vec.create_tables()
+    vec.drop_index()
+
+    total = 0
+    for batch in _read_batches(path, batch_size):
+        vec.upsert(_arrow_to_record_batch(batch, dimensions))
+        total += batch.num_rows
+
+    if build_index:
+        vec.create_index()
+
+    elapsed_time = time.time() - start_time
+    logging.info(
+        f"Imported {total} records from {path} into "
+        f"{vec.vector_settings.table_name} in {elapsed_time:.3f} seconds"
+    )
+    return total
@@ -1,29 +1,54 @@
 import logging
 import time
 from typing import Any, List, Optional, Tuple, Union
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
+import numpy as np
 import pandas as pd
 from config.settings import get_settings
+import database.partitioning as partitioning
+from database.connection_router import ConnectionRouter
+from database.record_batch import COPY_COLUMNS, RecordBatch
+from psycopg2 import sql
 from timescale_vector import client
 from services.embedding_model_factory import EmbeddingModelFactory
+from services.resilient_embeddings import (
+    RESILIENT_EMBEDDING_MODEL,
+    ResilientEmbeddingModel,
+)
 
 
 class VectorStore:
     """A class for managing vector operations and database interactions."""
 
-    def __init__(self, embedding_model_client="bedrock_embedding_model"):
-        """Initialize the VectorStore with settings, OpenAI client, and Timescale Vector client."""
+    def __init__(
+        self,
+        embedding_model_client: Optional[Union[str, List[str]]] = "bedrock_embedding_model",
+    ):
+        """Initialize the VectorStore with settings, embedding model client, and Timescale Vector clients.
+
+        Writes go to the primary database. Searches are routed to the read replicas
+        configured in DatabaseSettings.replica_urls, if any.
+
+        Passing "resilient_embedding_model" enables the ResilientEmbeddingModel, which
+        uses ResilientEmbeddingModelSettings.providers as an ordered fallback chain with
+        deadlines and hedged requests. Passing a list of providers does the same with
+        that chain instead. Passing None creates a store without an embedding model,
+        for work on stored embeddings only, such as snapshots.
+        """
         self.settings = get_settings()
-        self.embedding_model_client = EmbeddingModelFactory(embedding_model_client)
+        if embedding_model_client is None:
+            self.embedding_model_client = None
+        elif embedding_model_client == RESILIENT_EMBEDDING_MODEL:
+            self.embedding_model_client = ResilientEmbeddingModel()
+        elif isinstance(embedding_model_client, str):
+            self.embedding_model_client = EmbeddingModelFactory(embedding_model_client)
+        else:
+            self.embedding_model_client = ResilientEmbeddingModel(embedding_model_client)
 
         self.vector_settings = self.settings.vector_store
-        self.vec_client = client.Sync(
-            self.settings.database.service_url,
-            self.vector_settings.table_name,
-            self.vector_settings.embedding_dimensions,
-            time_partition_interval=self.vector_settings.time_partition_interval,
-        )
+        self.router = ConnectionRouter(self.settings.database, self.vector_settings)
+        self.vec_client = self.router.primary
 
     def get_embedding(self, text: str) -> List[float]:
         """
@@ -33,7 +58,7 @@ class VectorStore:
             text: The input text to generate an embedding for.
 
         Returns:
-            A list of floats representing the embedding.
+            The embedding, as a list of floats or a float32 array depending on the provider.
         """
         text = text.replace("\n", " ")
         start_time = time.time()
@@ -43,32 +68,93 @@ class VectorStore:
         logging.info(f"Embedding generated in {elapsed_time:.3f} seconds")
         return embedding
 
+    def get_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for a list of texts.
+
+        Args:
+            texts: The input texts to generate embeddings for.
+
+        Returns:
+            A 2-D float32 array with one row per text.
+        """
+        texts = [text.replace("\n", " ") for text in texts]
+        start_time = time.time()
+
+        embeddings = self.embedding_model_client.create_embeddings(texts)
+        elapsed_time = time.time() - start_time
+        logging.info(
+            f"{len(texts)} embeddings generated in {elapsed_time:.3f} seconds"
+        )
+        return embeddings
+
     def create_tables(self) -> None:
         """Create the necessary tablesin the database"""
-        self.vec_client.create_tables()
+        self.router.write(lambda vec_client: vec_client.create_tables())
 
     def create_index(self) -> None:
         """Create the StreamingDiskANN index to spseed up similarity search"""
-        self.vec_client.create_embedding_index(client.DiskAnnIndex())
+        self.router.write(
+            lambda vec_client: vec_client.create_embedding_index(client.DiskAnnIndex())
+        )
 
     def drop_index(self) -> None:
         """Drop the StreamingDiskANN index in the database"""
-        self.vec_client.drop_embedding_index()
+        self.router.write(lambda vec_client: vec_client.drop_embedding_index())
 
-    def upsert(self, df: pd.DataFrame) -> None:
+    def upsert(self, records: Union[pd.DataFrame, RecordBatch]) -> None:
         """
-        Insert or update records in the database from a pandas DataFrame.
+        Insert or update records in the database from a pandas DataFrame or a RecordBatch.
+
+        A RecordBatch is streamed to the database with a binary COPY, which avoids
+        converting every embedding component to a Python object.
 
         Args:
-            df: A pandas DataFrame containing the data to insert or update.
-                Expected columns: id, metadata, contents, embedding
+            records: The data to insert or update.
+                Expected DataFrame columns: id, metadata, contents, embedding
         """
-        records = df.to_records(index=False)
-        self.vec_client.upsert(list(records))
+        if isinstance(records, RecordBatch):
+            self.router.write(lambda vec_client: self._copy_batch(vec_client, records))
+        else:
+            rows = records.to_records(index=False)
+            self.router.write(lambda vec_client: vec_client.upsert(list(rows)))
         logging.info(
-            f"Inserted {len(df)} records into {self.vector_settings.table_name}"
+            f"Inserted {len(records)} records into {self.vector_settings.table_name}"
         )
 
+    def _copy_batch(self, vec_client: client.Sync, batch: RecordBatch) -> None:
+        """
+        Load a RecordBatch through a temporary staging table using binary COPY.
+
+        Like the Timescale Vector client's upsert, records whose ID already exists are skipped.
+        """
+        if not len(batch):
+            return
+
+        table = sql.Identifier(self.vector_settings.table_name)
+        staging = sql.Identifier(f"{self.vector_settings.table_name}_staging")
+        columns = sql.SQL(", ").join(map(sql.Identifier, COPY_COLUMNS))
+        with vec_client.connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    sql.SQL(
+                        "CREATE TEMP TABLE IF NOT EXISTS {staging} "
+                        "(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+                    ).format(staging=staging, table=table)
+                )
+                cur.copy_expert(
+                    sql.SQL("COPY {staging} ({columns}) FROM STDIN WITH (FORMAT BINARY)")
+                    .format(staging=staging, columns=columns)
+                    .as_string(conn),
+                    batch.to_copy_binary(),
+                )
+                cur.execute(
+                    sql.SQL(
+                        "INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} "
+                        "ON CONFLICT DO NOTHING"
+                    ).format(table=table, columns=columns, staging=staging)
+                )
+
     def search(
         self,
         query_text: str,
@@ -77,6 +163,13 @@ class VectorStore:
         predicates: Optional[client.Predicates] = None,
         time_range: Optional[Tuple[datetime, datetime]] = None,
         return_dataframe: bool = True,
+        adaptive: bool = False,
+        max_distance: Optional[float] = None,
+        max_gap: Optional[float] = None,
+        query_embedding: Optional[List[float]] = None,
+        tiered: bool = False,
+        min_results: Optional[int] = None,
+        recency_weight: Optional[float] = None,
     ) -> Union[List[Tuple[Any, ...]], pd.DataFrame]:
         """
         Query the vector database for similar embeddings based on input text.
@@ -95,6 +188,27 @@ class VectorStore:
                 - | is used to combine multiple predicates with OR operator.
             time_range: A tuple of (start_date, end_date) to filter results by time.
             return_dataframe: Whether to return results as a DataFrame (default: True).
+            adaptive: Whether to over-fetch and keep only results close enough to the query
+                and to the best hit, so fewer than `limit` (possibly zero) results are returned.
+            max_distance: Adaptive and tiered modes only. Maximum cosine distance of a result
+                (default: VectorStoreSettings.adaptive_max_distance).
+            max_gap: Adaptive and tiered modes only. Maximum distance of a result beyond the
+                best hit's distance (default: VectorStoreSettings.adaptive_max_gap).
+            query_embedding: A precomputed embedding of query_text, to skip embedding it again.
+            tiered: Whether to search the most recent partitions first, widening the time
+                window (VectorStoreSettings.recency_tier_partitions, then all time) only while
+                fewer than `min_results` results pass the distance cutoffs. A narrower window
+                returns only its passing results, so they can't displace stronger older
+                matches; from the whole table, weak results are dropped only if `adaptive`
+                is also set. Can't be combined with time_range.
+            min_results: Tiered mode only. The number of results that must pass the cutoffs
+                to stop widening the window (default: VectorStoreSettings.recency_min_results,
+                or `limit` if that is unset). Lower values trade fewer results for scanning
+                fewer partitions.
+            recency_weight: How much to favour recent records. Results are ranked by their
+                distance plus recency_weight times a penalty that grows from 0 to 1 with age,
+                reaching 0.5 at VectorStoreSettings.recency_half_life. The distances
+                returned are unchanged (default: VectorStoreSettings.recency_weight).
 
         Returns:
             Either a list of tuples or a pandas DataFrame containing the search results.
@@ -116,14 +230,29 @@ class VectorStore:
         Time-based filtering:
             Search with time range:
                 vector_store.search("Recent updates", time_range=(datetime(2024, 1, 1), datetime(2024, 1, 31)))
+
+        Adaptive top-k:
+            Return up to 5 results, dropping weak matches:
+                vector_store.search("What is the weather in Tokyo?", limit=5, adaptive=True)
+
+        Recency:
+            Search the newest partitions first, and prefer recent records:
+                vector_store.search("Latest pricing", tiered=True, recency_weight=0.1)
         """
-        query_embedding = self.get_embedding(query_text)
+        if tiered and time_range:
+            raise ValueError("tiered search can't be combined with time_range")
+        if recency_weight is None:
+            recency_weight = self.vector_settings.recency_weight
+
+        if query_embedding is None:
+            query_embedding = self.get_embedding(query_text)
 
         start_time = time.time()
 
-        search_args = {
-            "limit": limit,
-        }
+        fetch_limit = limit
+        if adaptive or recency_weight:
+            fetch_limit = limit * self.vector_settings.adaptive_overfetch_factor
+        search_args = {"limit": fetch_limit}
 
         if metadata_filter:
             search_args["filter"] = metadata_filter
@@ -135,17 +264,207 @@ class VectorStore:
             start_date, end_date = time_range
             search_args["uuid_time_filter"] = client.UUIDTimeRange(start_date, end_date)
 
-        results = self.vec_client.search(query_embedding, **search_args)
+        if tiered:
+            results = self._tiered_search(
+                query_embedding,
+                search_args,
+                min_results or self.vector_settings.recency_min_results or limit,
+                max_distance,
+                max_gap,
+            )
+        else:
+            results = self.router.read(
+                lambda vec_client: vec_client.search(query_embedding, **search_args)
+            )
         elapsed_time = time.time() - start_time
 
         logging.info(f"Vector search completed in {elapsed_time:.3f} seconds")
 
+        if adaptive:
+            kept = self._cut_results(results, fetch_limit, max_distance, max_gap)
+            if results:
+                logging.info(
+                    f"Adaptive search kept {len(kept)} of {len(results)} results "
+                    f"(best distance {results[0][-1]:.3f})"
+                )
+            results = kept
+        if recency_weight:
+            results = self._rank_by_recency(results, recency_weight)
+        results = results[:limit]
+
         if return_dataframe:
-            return self._create_dataframe_from_results(results)
+            return self.create_dataframe_from_results(results)
         else:
             return results
 
-    def _create_dataframe_from_results(
+    def _cut_results(
+        self,
+        results: List[Tuple[Any, ...]],
+        limit: int,
+        max_distance: Optional[float] = None,
+        max_gap: Optional[float] = None,
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Keep at most `limit` results that pass the absolute and relative distance cutoffs.
+
+        Args:
+            results: Search results ordered by distance, with the distance as the last element.
+            limit: The maximum number of results to keep.
+            max_distance: The maximum distance of a result.
+            max_gap: The maximum distance of a result beyond the best hit's distance.
+
+        Returns:
+            The results that pass both cutoffs, possibly none.
+        """
+        if max_distance is None:
+            max_distance = self.vector_settings.adaptive_max_distance
+        if max_gap is None:
+            max_gap = self.vector_settings.adaptive_max_gap
+        if not results:
+            return results
+
+        best_distance = results[0][-1]
+        kept = [
+            result
+            for result in results
+            if result[-1] <= max_distance and result[-1] - best_distance <= max_gap
+        ][:limit]
+        return kept
+
+    def _tiered_search(
+        self,
+        query_embedding: List[float],
+        search_args: dict,
+        min_results: int,
+        max_distance: Optional[float] = None,
+        max_gap: Optional[float] = None,
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Search increasingly wide windows of recent partitions until enough results pass
+        the distance cutoffs.
+
+        Records are partitioned on the time in their UUID v1 IDs, so a window covering
+        the newest N partitions only scans those chunks. Each window contains the
+        previous one, and the last tier searches the whole table.
+
+        Args:
+            query_embedding: The query embedding.
+            search_args: Arguments for the Timescale Vector client's search.
+            min_results: The number of results that must pass the cutoffs to stop widening.
+            max_distance: The maximum distance of a result.
+            max_gap: The maximum distance of a result beyond the best hit's distance.
+
+        Returns:
+            The passing results of the narrowest window with at least `min_results` of
+            them, or all results of the whole table.
+        """
+        now = datetime.now(timezone.utc)
+        interval = self.vector_settings.time_partition_interval
+        windows = [interval * n for n in self.vector_settings.recency_tier_partitions]
+
+        for window in windows + [None]:
+            tier_args = dict(search_args)
+            if window is not None:
+                tier_args["uuid_time_filter"] = client.UUIDTimeRange(start_date=now - window)
+            results = self.router.read(
+                lambda vec_client: vec_client.search(query_embedding, **tier_args)
+            )
+            passed = self._cut_results(results, len(results), max_distance, max_gap)
+            if window is not None and len(passed) >= min_results:
+                logging.info(
+                    f"Tiered search stopped at window {window} "
+                    f"with {len(passed)} of {len(results)} results passing"
+                )
+                return passed
+
+        logging.info(
+            f"Tiered search widened to all time with {len(passed)} of "
+            f"{len(results)} results passing"
+        )
+        return results
+
+    def _rank_by_recency(
+        self,
+        results: List[Tuple[Any, ...]],
+        recency_weight: float,
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Order results by distance plus a penalty for age derived from their UUID v1 IDs.
+
+        Args:
+            results: Search results, with the ID first and the distance last.
+            recency_weight: The penalty for a record infinitely old; half of it applies
+                at VectorStoreSettings.recency_half_life.
+
+        Returns:
+            The same results, most relevant first.
+        """
+        now = datetime.now(timezone.utc)
+        half_life = self.vector_settings.recency_half_life
+
+        def score(result: Tuple[Any, ...]) -> float:
+            age = max(now - partitioning.uuid_time(result[0]), timedelta(0))
+            return result[-1] + recency_weight * (1 - 0.5 ** (age / half_life))
+
+        return sorted(results, key=score)
+
+    def ingest_stats(self, window: timedelta = timedelta(days=28)) -> Tuple[float, float]:
+        """
+        Measure the recent ingest rate from the times encoded in the record IDs.
+
+        Args:
+            window: How far back to look.
+
+        Returns:
+            A tuple of (rows per day, average bytes per row) over the window, or over
+            the span of the records in it if that is shorter.
+        """
+        query = sql.SQL(
+            "SELECT count(*), avg(pg_column_size(t.*)), "
+            "extract(epoch FROM now() - min(uuid_timestamp(id))) "
+            "FROM {table} t WHERE uuid_timestamp(id) >= now() - %s"
+        ).format(table=sql.Identifier(self.vector_settings.table_name))
+
+        def measure(vec_client: client.Sync) -> Tuple[Any, ...]:
+            with vec_client.connect() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(query, (window,))
+                    return cur.fetchone()
+
+        count, bytes_per_row, span_seconds = self.router.read(measure)
+        if not count:
+            return 0.0, 0.0
+        days = max(float(span_seconds), 3600.0) / 86400
+        return count / days, float(bytes_per_row)
+
+    def recommend_partition_interval(
+        self, window: timedelta = timedelta(days=28)
+    ) -> timedelta:
+        """
+        Recommend a time_partition_interval for the observed ingest rate.
+
+        Partitions are sized to about VectorStoreSettings.target_partition_bytes. Use the
+        result as VectorStoreSettings.time_partition_interval for new tables, or apply it
+        to future chunks of an existing table with TimescaleDB's set_chunk_time_interval.
+
+        Args:
+            window: How far back to measure the ingest rate.
+
+        Returns:
+            The recommended partition interval.
+        """
+        rows_per_day, bytes_per_row = self.ingest_stats(window)
+        interval = partitioning.recommend_partition_interval(
+            rows_per_day, bytes_per_row, self.vector_settings.target_partition_bytes
+        )
+        logging.info(
+            f"Ingesting {rows_per_day:.0f} rows/day of {bytes_per_row:.0f} bytes; "
+            f"recommended partition interval {interval} "
+            f"(currently {self.vector_settings.time_partition_interval})"
+        )
+        return interval
+
+    def create_dataframe_from_results(
         self,
         results: List[Tuple[Any, ...]],
     ) -> pd.DataFrame:
@@ -205,15 +524,17 @@ class VectorStore:
             )
 
         if delete_all:
-            self.vec_client.delete_all()
+            self.router.write(lambda vec_client: vec_client.delete_all())
             logging.info(f"Deleted all records from {self.vector_settings.table_name}")
         elif ids:
-            self.vec_client.delete_by_ids(ids)
+            self.router.write(lambda vec_client: vec_client.delete_by_ids(ids))
             logging.info(
                 f"Deleted {len(ids)} records from {self.vector_settings.table_name}"
             )
         elif metadata_filter:
-            self.vec_client.delete_by_metadata(metadata_filter)
+            self.router.write(
+                lambda vec_client: vec_client.delete_by_metadata(metadata_filter)
+            )
             logging.info(
                 f"Deleted records matching metadata filter from {self.vector_settings.table_name}"
             )
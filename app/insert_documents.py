@@ -0,0 +1,97 @@
+import argparse
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List
+
+from config.settings import get_settings
+from database.record_batch import RecordBatch
+from database.vector_store import VectorStore
+from services.chunker import Chunk, DocumentChunker, batched
+from services.deduplicator import Deduplicator
+from services.rate_limiter import log_rate_limiter_stats
+from timescale_vector.client import uuid_from_time
+
+####################
+# Index long-form text documents (e.g. manuals or policies already converted to text).
+# Each file is streamed through the chunker and embedded and upserted in bounded
+# batches, so memory use stays constant regardless of the size of the source.
+# Near-duplicates are only detected within a batch; duplicates that end up in
+# different batches are all indexed.
+#
+# Usage:
+#   python insert_documents.py ../data/manual.txt ../data/returns_policy.txt
+####################
+
+parser = argparse.ArgumentParser(description="Chunk, embed and index text documents.")
+parser.add_argument("paths", nargs="+", help="Text files to index")
+parser.add_argument(
+    "--create-index",
+    action="store_true",
+    help="Create the DiskANN index after loading",
+)
+parser.add_argument(
+    "--dedup-report",
+    help="Where to write the deduplication report (default: DeduplicationSettings.report_path)",
+)
+args = parser.parse_args()
+
+settings = get_settings()
+vec = VectorStore(settings.service.embedding_model_client)
+chunker = DocumentChunker()
+deduplicator = Deduplicator()
+
+
+def prepare_batch(chunks: List[Chunk]):
+    """Assign time-based IDs to a batch of chunks and drop near-identical texts within it."""
+    ids = [str(uuid_from_time(datetime.now())) for _ in chunks]
+    metadata = [
+        {**chunk.metadata, "created_at": datetime.now().isoformat()} for chunk in chunks
+    ]
+    return deduplicator.deduplicate_texts(
+        ids, [chunk.contents for chunk in chunks], metadata
+    )
+
+
+def embed_batch(ids: List[str], contents: List[str], metadata: List[dict]) -> RecordBatch:
+    """Embed a batch of chunks into a RecordBatch."""
+    return RecordBatch(
+        ids=ids,
+        contents=contents,
+        metadata=metadata,
+        embeddings=vec.get_embeddings(contents),
+    )
+
+
+def upsert_batch(records: RecordBatch) -> int:
+    """Merge near-identical embeddings and upsert the batch."""
+    records = deduplicator.deduplicate_batch(records)
+    vec.upsert(records)
+    return len(records)
+
+
+vec.create_tables()
+
+total = 0
+max_in_flight = settings.chunker.max_batches_in_flight
+with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+    for path in args.paths:
+        in_flight = deque()
+        for chunks in batched(chunker.chunk_file(path), settings.chunker.batch_size):
+            # Only a bounded number of batches is held in memory at a time
+            if len(in_flight) == max_in_flight:
+                total += upsert_batch(in_flight.popleft().result())
+            in_flight.append(executor.submit(embed_batch, *prepare_batch(chunks)))
+
+        while in_flight:
+            total += upsert_batch(in_flight.popleft().result())
+        logging.info(f"Indexed {path}")
+
+logging.info(f"Indexed {total} chunks from {len(args.paths)} documents")
+deduplicator.log_report()
+deduplicator.write_report(args.dedup_report)
+log_rate_limiter_stats()
+
+if args.create_index:
+    vec.create_index()  # DiskAnnIndex
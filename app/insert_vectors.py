@@ -1,11 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
+from config.settings import get_settings
+from database.record_batch import RecordBatch
 from database.vector_store import VectorStore
+from services.deduplicator import Deduplicator
+from services.rate_limiter import log_rate_limiter_stats
+from services.resilient_embeddings import RESILIENT_EMBEDDING_MODEL
 from timescale_vector.client import uuid_from_time
 
-# Initialize VectorStore
-vec = VectorStore()
+# Initialize VectorStore with the configured embedding model (EMBEDDING_MODEL_CLIENT)
+embedding_model_client = get_settings().service.embedding_model_client
+vec = VectorStore(embedding_model_client)
 
 # Read the CSV file
 df = pd.read_csv("../data/faq_dataset.csv", sep=";")
@@ -33,23 +41,56 @@ def prepare_record(row):
         This is useful when your content already has an associated datetime.
     """
     content = f"Question: {row['question']}\nAnswer: {row['answer']}"
-    embedding = vec.get_embedding(content)
-    return pd.Series(
+    return (
+        str(uuid_from_time(datetime.now())),
         {
-            "id": str(uuid_from_time(datetime.now())),
-            "metadata": {
-                "category": row["category"],
-                "created_at": datetime.now().isoformat(),
-            },
-            "contents": content,
-            "embedding": embedding,
-        }
+            "category": row["category"],
+            "created_at": datetime.now().isoformat(),
+        },
+        content,
     )
 
 
-records_df = df.apply(prepare_record, axis=1)
+prepared = [prepare_record(row) for _, row in df.iterrows()]
+ids, metadata, contents = map(list, zip(*prepared)) if prepared else ([], [], [])
+
+# Drop near-identical texts before paying to embed them
+deduplicator = Deduplicator()
+ids, contents, metadata = deduplicator.deduplicate_texts(ids, contents, metadata)
+
+# Embed in batches in parallel; the provider's rate limiter caps the effective concurrency
+# The resilient client batches and rate limits like its first provider
+provider = embedding_model_client
+if provider == RESILIENT_EMBEDDING_MODEL:
+    provider = get_settings().resilient_embedding_model.providers[0]
+embedding_settings = getattr(get_settings(), provider)
+batch_size = embedding_settings.batch_size
+batches = [
+    contents[start : start + batch_size]
+    for start in range(0, len(contents), batch_size)
+]
+with ThreadPoolExecutor(max_workers=embedding_settings.rate_limit.max_concurrency) as executor:
+    embedded = list(executor.map(vec.get_embeddings, batches))
+embeddings = (
+    np.concatenate(embedded)
+    if embedded
+    else np.empty((0, get_settings().vector_store.embedding_dimensions), dtype=np.float32)
+)
+log_rate_limiter_stats()
+
+records = RecordBatch(
+    ids=ids,
+    contents=contents,
+    metadata=metadata,
+    embeddings=embeddings,
+)
+
+# Merge paraphrases that only show up as near-identical embeddings
+records = deduplicator.deduplicate_batch(records)
+deduplicator.log_report()
+deduplicator.write_report()
 
 # Create tables and insert data
 vec.create_tables()
 vec.create_index()  # DiskAnnIndex
-vec.upsert(records_df)
+vec.upsert(records)
@@ -0,0 +1,256 @@
+import argparse
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from config.settings import get_settings
+from database.vector_store import VectorStore
+from services.synthesizer import Synthesizer
+
+####################
+# Open-loop load test of the end-to-end RAG path: embed -> search -> synthesize.
+# Questions are replayed at a fixed rate regardless of how fast earlier requests
+# complete, and latency is measured from each request's scheduled start, so
+# queueing delay under overload is included (no coordinated omission).
+#
+# Usage (stub providers with injected latency, against the real database):
+#   python load_test.py --qps 20 --duration 60 \
+#       --embedding-model-client stub_embedding_model --llm-client stub \
+#       --stub-embedding-latency-ms 40 --stub-llm-latency-ms 800 --output report.json
+####################
+
+STAGES = ["queue", "embed", "search", "synthesize", "end_to_end"]
+
+PARAPHRASE_TEMPLATES = [
+    "{question}",
+    "Can you tell me: {question}",
+    "I have a question. {question}",
+    "{question} Please keep it short.",
+    "{lowered}",
+]
+
+
+def load_questions(path: str, paraphrases: int, seed: int) -> List[str]:
+    """Load the questions from the FAQ dataset, each with up to `paraphrases` rewordings."""
+    df = pd.read_csv(path, sep=";")
+    questions = []
+    for question in df["question"]:
+        lowered = question.lower().rstrip("?")
+        for template in PARAPHRASE_TEMPLATES[: paraphrases + 1]:
+            questions.append(template.format(question=question, lowered=lowered))
+    random.Random(seed).shuffle(questions)
+    return questions
+
+
+def latency_summary(samples: List[float]) -> Dict[str, Optional[float]]:
+    """Summarize latencies given in seconds as milliseconds."""
+    if not samples:
+        return {"count": 0}
+    ms = np.asarray(samples) * 1000
+    p50, p90, p95, p99 = np.percentile(ms, [50, 90, 95, 99])
+    return {
+        "count": len(samples),
+        "mean": round(float(ms.mean()), 3),
+        "p50": round(float(p50), 3),
+        "p90": round(float(p90), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "max": round(float(ms.max()), 3),
+    }
+
+
+class LoadTest:
+    """Replays questions against VectorStore.search and Synthesizer.generate_response."""
+
+    def __init__(
+        self,
+        vec: VectorStore,
+        llm_client: str,
+        limit: int = 5,
+        adaptive: bool = False,
+        tiered: bool = False,
+        synthesize: bool = True,
+    ):
+        self.vec = vec
+        self.llm_client = llm_client
+        self.limit = limit
+        self.adaptive = adaptive
+        self.tiered = tiered
+        self.synthesize = synthesize
+        self.latencies: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        self.errors_by_stage: Counter = Counter()
+        self.errors_by_type: Counter = Counter()
+        self.completed = 0
+        self._lock = threading.Lock()
+
+    def run_request(self, question: str, scheduled_at: float) -> None:
+        timings = {"queue": time.perf_counter() - scheduled_at}
+        stage = "embed"
+        try:
+            start = time.perf_counter()
+            embedding = self.vec.get_embedding(question)
+            timings["embed"] = time.perf_counter() - start
+
+            stage = "search"
+            start = time.perf_counter()
+            context = self.vec.search(
+                question,
+                limit=self.limit,
+                adaptive=self.adaptive,
+                tiered=self.tiered,
+                query_embedding=embedding,
+            )
+            timings["search"] = time.perf_counter() - start
+
+            if self.synthesize:
+                stage = "synthesize"
+                start = time.perf_counter()
+                Synthesizer.generate_response(question, context, self.llm_client)
+                timings["synthesize"] = time.perf_counter() - start
+        except Exception as e:
+            with self._lock:
+                self.errors_by_stage[stage] += 1
+                self.errors_by_type[type(e).__name__] += 1
+            return
+
+        timings["end_to_end"] = time.perf_counter() - scheduled_at
+        with self._lock:
+            self.completed += 1
+            for name, elapsed in timings.items():
+                self.latencies[name].append(elapsed)
+
+    def run(
+        self,
+        questions: List[str],
+        qps: float,
+        duration: float,
+        max_workers: int,
+        poisson: bool = False,
+        seed: int = 0,
+    ) -> Dict:
+        """
+        Issue requests at `qps` for `duration` seconds and return the report.
+
+        Args:
+            questions: The questions to replay, cycled as needed.
+            qps: The target request rate.
+            duration: How long to issue requests for, in seconds.
+            max_workers: The maximum number of requests in progress at once.
+            poisson: Use exponentially distributed gaps between requests instead of fixed ones.
+            seed: Seed for the arrival process.
+        """
+        rng = random.Random(seed)
+        total = int(qps * duration)
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="load")
+        started_at = time.perf_counter()
+        scheduled_at = started_at
+        for i in range(total):
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(self.run_request, questions[i % len(questions)], scheduled_at)
+            scheduled_at += rng.expovariate(qps) if poisson else 1.0 / qps
+        executor.shutdown(wait=True)
+        elapsed = time.perf_counter() - started_at
+
+        errors = sum(self.errors_by_stage.values())
+        return {
+            "requests": total,
+            "completed": self.completed,
+            "errors": {
+                "total": errors,
+                "rate": round(errors / total, 4) if total else 0.0,
+                "by_stage": dict(self.errors_by_stage),
+                "by_type": dict(self.errors_by_type),
+            },
+            "duration_seconds": round(elapsed, 3),
+            "offered_qps": qps,
+            "achieved_qps": round(self.completed / elapsed, 3) if elapsed else 0.0,
+            "latency_ms": {
+                stage: latency_summary(samples)
+                for stage, samples in self.latencies.items()
+            },
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop load test of the RAG path.")
+    parser.add_argument("--qps", type=float, default=5.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to generate load for")
+    parser.add_argument("--poisson", action="store_true", help="Poisson instead of uniform arrivals")
+    parser.add_argument("--questions", default="../data/faq_dataset.csv")
+    parser.add_argument("--paraphrases", type=int, default=2, help="Rewordings per question")
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--adaptive", action="store_true", help="Use adaptive top-k retrieval")
+    parser.add_argument("--tiered", action="store_true", help="Search recent partitions first")
+    parser.add_argument("--skip-synthesis", action="store_true", help="Only embed and search")
+    parser.add_argument("--max-workers", type=int, default=64)
+    parser.add_argument("--embedding-model-client", default="bedrock_embedding_model")
+    parser.add_argument("--llm-client", default="bedrock")
+    parser.add_argument("--stub-embedding-latency-ms", type=float)
+    parser.add_argument("--stub-embedding-jitter-ms", type=float)
+    parser.add_argument("--stub-llm-latency-ms", type=float)
+    parser.add_argument("--stub-llm-jitter-ms", type=float)
+    parser.add_argument("--stub-error-rate", type=float)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    # Stub settings must be set before the stub clients are created
+    settings = get_settings()
+    overrides = [
+        (settings.stub_embedding_model, "latency_ms", args.stub_embedding_latency_ms),
+        (settings.stub_embedding_model, "latency_jitter_ms", args.stub_embedding_jitter_ms),
+        (settings.stub, "latency_ms", args.stub_llm_latency_ms),
+        (settings.stub, "latency_jitter_ms", args.stub_llm_jitter_ms),
+        (settings.stub_embedding_model, "error_rate", args.stub_error_rate),
+        (settings.stub, "error_rate", args.stub_error_rate),
+    ]
+    for section, name, value in overrides:
+        if value is not None:
+            setattr(section, name, value)
+
+    # Keep per-request logging from drowning out the report
+    logging.getLogger().setLevel(logging.WARNING)
+
+    questions = load_questions(args.questions, args.paraphrases, args.seed)
+    # Provider clients print progress; keep stdout for the report only
+    with redirect_stdout(sys.stderr):
+        load_test = LoadTest(
+            VectorStore(args.embedding_model_client),
+            llm_client=args.llm_client,
+            limit=args.limit,
+            adaptive=args.adaptive,
+            tiered=args.tiered,
+            synthesize=not args.skip_synthesis,
+        )
+        report = load_test.run(
+            questions,
+            qps=args.qps,
+            duration=args.duration,
+            max_workers=args.max_workers,
+            poisson=args.poisson,
+            seed=args.seed,
+        )
+    report["config"] = {
+        key: value for key, value in vars(args).items() if key != "output"
+    }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
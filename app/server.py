@@ -0,0 +1,273 @@
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import uvicorn
+from config.settings import ServiceSettings, get_settings
+from database.vector_store import VectorStore
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from services.llm_factory import get_llm_factory
+from services.synthesizer import SynthesizedResponse, Synthesizer
+
+####################
+# HTTP service exposing retrieval and answer generation.
+# A single VectorStore (with pooled database connections) and shared LLM clients
+# serve all requests. Blocking work runs on a bounded worker pool; requests beyond
+# its capacity are rejected with 429, and every request has a deadline.
+#
+# Usage:
+#   python server.py
+#   EMBEDDING_MODEL_CLIENT=stub_embedding_model LLM_CLIENT=stub python server.py
+####################
+
+
+class SearchRequest(BaseModel):
+    question: str
+    limit: int = Field(default=5, ge=1, le=100)
+    adaptive: bool = False
+    tiered: bool = False
+    recency_weight: Optional[float] = Field(default=None, ge=0)
+    metadata_filter: Optional[Dict[str, Any]] = None
+
+
+class SearchResult(BaseModel):
+    id: str
+    content: str
+    distance: float
+    metadata: Dict[str, Any]
+
+
+class SearchResponse(BaseModel):
+    results: List[SearchResult]
+
+
+class AnswerResponse(BaseModel):
+    answer: str
+    thought_process: List[str]
+    enough_context: bool
+    sources: List[SearchResult]
+
+
+class WorkerPool:
+    """
+    A bounded thread pool for blocking calls, with load shedding.
+
+    A request is admitted only while both the number of active requests and the
+    number of unfinished tasks are below `max_workers + max_queued`. Tasks abandoned
+    after a deadline keep counting until their thread finishes, so the pool can't
+    be overrun by work that is still running in the background.
+    """
+
+    def __init__(self, max_workers: int, max_queued: int):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="worker"
+        )
+        self.capacity = max_workers + max_queued
+        self.active_requests = 0
+        self.pending_tasks = 0
+
+    def admit(self) -> bool:
+        """Try to admit a request; must be paired with `release` when it's admitted."""
+        if max(self.active_requests, self.pending_tasks) >= self.capacity:
+            return False
+        self.active_requests += 1
+        return True
+
+    def release(self) -> None:
+        self.active_requests -= 1
+
+    async def run(self, deadline: float, fn: Callable, *args) -> Any:
+        """
+        Run a blocking call on the pool, giving up at the deadline.
+
+        Raises:
+            asyncio.TimeoutError: If the deadline passes first.
+        """
+        loop = asyncio.get_running_loop()
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise asyncio.TimeoutError()
+
+        self.pending_tasks += 1
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(self._task_done)
+        )
+        return await asyncio.wait_for(asyncio.wrap_future(future), remaining)
+
+    def _task_done(self) -> None:
+        self.pending_tasks -= 1
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _to_search_results(results: List[Tuple[Any, ...]]) -> List[SearchResult]:
+    return [
+        SearchResult(
+            id=str(record_id), content=content, distance=distance, metadata=metadata
+        )
+        for record_id, metadata, content, _, distance in results
+    ]
+
+
+def create_app(
+    settings: Optional[ServiceSettings] = None,
+    vector_store: Optional[VectorStore] = None,
+) -> FastAPI:
+    """
+    Create the HTTP service.
+
+    Args:
+        settings: Service settings (default: from get_settings()).
+        vector_store: The VectorStore to serve from; created on startup if not given.
+    """
+    settings = settings or get_settings().service
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        app.state.vector_store = vector_store or VectorStore(
+            settings.embedding_model_client
+        )
+        app.state.workers = WorkerPool(settings.max_workers, settings.max_queued_requests)
+        # Create the shared LLM client up front rather than on the first request
+        get_llm_factory(settings.llm_client)
+        yield
+        app.state.workers.shutdown()
+        app.state.vector_store.router.close()
+
+    app = FastAPI(title="pgvectorscale RAG service", lifespan=lifespan)
+
+    def admit(request: Request) -> WorkerPool:
+        workers: WorkerPool = request.app.state.workers
+        if not workers.admit():
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests in flight",
+                headers={"Retry-After": str(settings.retry_after)},
+            )
+        return workers
+
+    def deadline() -> float:
+        return asyncio.get_running_loop().time() + settings.request_timeout
+
+    def retrieve(vec: VectorStore, body: SearchRequest) -> List[Tuple[Any, ...]]:
+        return vec.search(
+            body.question,
+            limit=body.limit,
+            metadata_filter=body.metadata_filter,
+            adaptive=body.adaptive,
+            tiered=body.tiered,
+            recency_weight=body.recency_weight,
+            return_dataframe=False,
+        )
+
+    @app.get("/health")
+    async def health(request: Request) -> Dict[str, int]:
+        workers: WorkerPool = request.app.state.workers
+        return {
+            "active_requests": workers.active_requests,
+            "pending_tasks": workers.pending_tasks,
+            "capacity": workers.capacity,
+        }
+
+    @app.post("/search", response_model=SearchResponse)
+    async def search(body: SearchRequest, request: Request) -> SearchResponse:
+        workers = admit(request)
+        try:
+            results = await workers.run(
+                deadline(), retrieve, request.app.state.vector_store, body
+            )
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Request deadline exceeded")
+        finally:
+            workers.release()
+        return SearchResponse(results=_to_search_results(results))
+
+    @app.post("/answer", response_model=AnswerResponse)
+    async def answer(body: SearchRequest, request: Request) -> AnswerResponse:
+        workers = admit(request)
+        vec: VectorStore = request.app.state.vector_store
+        request_deadline = deadline()
+        try:
+            results = await workers.run(request_deadline, retrieve, vec, body)
+            response: SynthesizedResponse = await workers.run(
+                request_deadline,
+                Synthesizer.generate_response,
+                body.question,
+                vec.create_dataframe_from_results(results),
+                settings.llm_client,
+            )
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Request deadline exceeded")
+        finally:
+            workers.release()
+        return AnswerResponse(
+            **response.model_dump(), sources=_to_search_results(results)
+        )
+
+    @app.post("/answer/stream")
+    async def answer_stream(body: SearchRequest, request: Request) -> StreamingResponse:
+        """
+        Stream the answer as newline-delimited JSON events: `sources` first, then
+        `partial` events as the answer grows, and finally `answer` (or `error`).
+        """
+        workers = admit(request)
+        vec: VectorStore = request.app.state.vector_store
+        request_deadline = deadline()
+        try:
+            results = await workers.run(request_deadline, retrieve, vec, body)
+        except asyncio.TimeoutError:
+            workers.release()
+            raise HTTPException(status_code=504, detail="Request deadline exceeded")
+        except BaseException:
+            workers.release()
+            raise
+
+        def event(event_type: str, **data) -> str:
+            return json.dumps({"type": event_type, **data}) + "\n"
+
+        async def events():
+            sources = _to_search_results(results)
+            try:
+                yield event("sources", sources=[s.model_dump() for s in sources])
+                stream = Synthesizer.stream_response(
+                    body.question,
+                    vec.create_dataframe_from_results(results),
+                    settings.llm_client,
+                )
+                done = object()
+                last_answer, response = None, None
+                while True:
+                    partial = await workers.run(request_deadline, next, stream, done)
+                    if partial is done:
+                        break
+                    response = partial
+                    if partial.answer and partial.answer != last_answer:
+                        last_answer = partial.answer
+                        yield event("partial", answer=partial.answer)
+                if response is not None:
+                    yield event("answer", **response.model_dump())
+            except asyncio.TimeoutError:
+                yield event("error", detail="Request deadline exceeded")
+            except Exception as e:
+                logging.exception("Streaming answer failed")
+                yield event("error", detail=str(e))
+            finally:
+                workers.release()
+
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
+    return app
+
+
+app = create_app()
+
+if __name__ == "__main__":
+    service_settings = get_settings().service
+    uvicorn.run(app, host=service_settings.host, port=service_settings.port)
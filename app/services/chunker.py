@@ -0,0 +1,143 @@
+import re
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from config.settings import ChunkerSettings, get_settings
+
+T = TypeVar("T")
+
+# A token is a run of non-whitespace characters plus the whitespace that follows it,
+# so joining consecutive tokens reproduces the original text exactly.
+TOKEN_PATTERN = re.compile(r"\S+\s*")
+
+
+@dataclass
+class Chunk:
+    """A piece of a document together with where it came from."""
+
+    contents: str
+    metadata: dict
+
+
+class DocumentChunker:
+    """
+    Split long-form text into overlapping chunks of a fixed number of tokens.
+
+    Text is consumed as a stream of blocks, so a file is never loaded in full and
+    memory use is bounded by the read size and the chunk size. Tokens are
+    whitespace-delimited words, which approximate model tokens closely enough for
+    sizing chunks.
+
+    Example:
+        chunker = DocumentChunker()
+        for chunk in chunker.chunk_file("manual.txt"):
+            print(chunk.metadata["char_start"], chunk.contents[:40])
+    """
+
+    def __init__(self, settings: Optional[ChunkerSettings] = None):
+        self.settings = settings or get_settings().chunker
+        if not 0 <= self.settings.chunk_overlap < self.settings.chunk_size:
+            raise ValueError("chunk_overlap must be at least 0 and less than chunk_size")
+
+    def chunk_file(self, path: str, metadata: Optional[dict] = None) -> Iterator[Chunk]:
+        """
+        Stream chunks from a UTF-8 text file.
+
+        Args:
+            path: Path of the file to chunk.
+            metadata: Extra metadata to attach to every chunk.
+        """
+        with open(path, encoding="utf-8", errors="replace") as f:
+            blocks = iter(lambda: f.read(self.settings.read_size), "")
+            yield from self.chunk_text(blocks, source=str(path), metadata=metadata)
+
+    def chunk_text(
+        self,
+        blocks: Iterable[str],
+        source: str,
+        metadata: Optional[dict] = None,
+    ) -> Iterator[Chunk]:
+        """
+        Stream chunks from text arriving in blocks of arbitrary size.
+
+        Every chunk's metadata records its source, its index within the source, the
+        character offsets it spans and the index of its first token.
+
+        Args:
+            blocks: The text, in order. Blocks may split words.
+            source: Name of the source, stored in the chunk metadata.
+            metadata: Extra metadata to attach to every chunk.
+        """
+        chunk_size = self.settings.chunk_size
+        step = chunk_size - self.settings.chunk_overlap
+        window: Deque[Tuple[str, int]] = deque()
+        chunk_index = 0
+        first_token = 0
+        new_tokens = 0
+
+        for token, start in self._tokens(blocks):
+            window.append((token, start))
+            new_tokens += 1
+            if len(window) == chunk_size:
+                yield self._make_chunk(window, source, chunk_index, first_token, metadata)
+                chunk_index += 1
+                for _ in range(step):
+                    window.popleft()
+                first_token += step
+                new_tokens = 0
+
+        if new_tokens:
+            yield self._make_chunk(window, source, chunk_index, first_token, metadata)
+
+    @staticmethod
+    def _tokens(blocks: Iterable[str]) -> Iterator[Tuple[str, int]]:
+        """Yield (token, character offset) pairs, carrying partial tokens across blocks."""
+        carry = ""
+        offset = 0
+        for block in blocks:
+            text = carry + block
+            end = 0
+            for match in TOKEN_PATTERN.finditer(text):
+                if match.end() == len(text):
+                    # The token, or its trailing whitespace, may continue in the next block.
+                    break
+                yield match.group(), offset + match.start()
+                end = match.end()
+            if not text.strip():
+                end = len(text)
+            carry = text[end:]
+            offset += end
+
+        for match in TOKEN_PATTERN.finditer(carry):
+            yield match.group(), offset + match.start()
+
+    @staticmethod
+    def _make_chunk(
+        window: Deque[Tuple[str, int]],
+        source: str,
+        chunk_index: int,
+        first_token: int,
+        metadata: Optional[dict],
+    ) -> Chunk:
+        contents = "".join(token for token, _ in window).rstrip()
+        char_start = window[0][1]
+        return Chunk(
+            contents=contents,
+            metadata={
+                **(metadata or {}),
+                "source": source,
+                "chunk_index": chunk_index,
+                "char_start": char_start,
+                "char_end": char_start + len(contents),
+                "token_start": first_token,
+            },
+        )
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Group an iterable into lists of at most `size` items, lazily."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
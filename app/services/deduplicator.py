@@ -0,0 +1,279 @@
+import json
+import logging
+import re
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from config.settings import DeduplicationSettings, get_settings
+from database.record_batch import RecordBatch
+
+# Largest prime below 2**32, used as the modulus of the MinHash permutations.
+MINHASH_PRIME = np.uint64(4294967291)
+
+
+@dataclass
+class DuplicateGroup:
+    """A set of records merged into one canonical record."""
+
+    stage: str
+    canonical_id: str
+    duplicate_ids: List[str]
+
+
+@dataclass
+class DeduplicationReport:
+    """Summary of the records removed by a Deduplicator."""
+
+    input_rows: int = 0
+    text_duplicates: int = 0
+    embedding_duplicates: int = 0
+    groups: List[DuplicateGroup] = field(default_factory=list)
+
+    @property
+    def output_rows(self) -> int:
+        return self.input_rows - self.text_duplicates - self.embedding_duplicates
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "input_rows": self.input_rows,
+            "output_rows": self.output_rows,
+            "text_duplicates": self.text_duplicates,
+            "embedding_duplicates": self.embedding_duplicates,
+            "groups": [group.__dict__ for group in self.groups],
+        }
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 where the smallest index is the root of its set."""
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> None:
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i != root_j:
+            self.parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    def groups(self) -> Dict[int, List[int]]:
+        groups = defaultdict(list)
+        for i in range(len(self.parent)):
+            groups[self.find(i)].append(i)
+        return groups
+
+
+class Deduplicator:
+    """
+    Near-duplicate detection for ingestion.
+
+    Duplicates are found in two stages:
+        1. Before embedding, MinHash signatures over word shingles of the contents are
+           compared with locality-sensitive hashing. This is cheap and saves an
+           embedding call for every duplicate found.
+        2. After embedding, records whose cosine similarity reaches the threshold are
+           merged, which catches paraphrases that share few words.
+
+    Each group of duplicates is reduced to its first record. Its metadata gains a
+    `duplicate_count`, plus a `variants` entry listing the distinct values of any
+    metadata key the duplicates disagree on. Results accumulate in `report`.
+
+    Duplicates are only found among the records passed to a single call, so when
+    records are deduplicated batch by batch, duplicates in different batches are kept.
+
+    Example:
+        deduplicator = Deduplicator()
+        ids, contents, metadata = deduplicator.deduplicate_texts(ids, contents, metadata)
+        batch = deduplicator.deduplicate_batch(batch)
+        deduplicator.log_report()
+        deduplicator.write_report()
+    """
+
+    def __init__(self, settings: Optional[DeduplicationSettings] = None):
+        self.settings = settings or get_settings().deduplication
+        if self.settings.num_permutations % self.settings.bands != 0:
+            raise ValueError("num_permutations must be a multiple of bands")
+
+        rng = np.random.default_rng(self.settings.seed)
+        self._a = rng.integers(1, 2**31, size=self.settings.num_permutations, dtype=np.uint64)
+        self._b = rng.integers(0, 2**31, size=self.settings.num_permutations, dtype=np.uint64)
+        self.report = DeduplicationReport()
+
+    def deduplicate_texts(
+        self,
+        ids: Sequence[str],
+        contents: Sequence[str],
+        metadata: Sequence[dict],
+    ) -> Tuple[List[str], List[str], List[dict]]:
+        """
+        Merge records with near-identical contents, before they are embedded.
+
+        Returns:
+            The ids, contents and metadata of the remaining records.
+        """
+        self.report.input_rows += len(ids)
+        if not self.settings.enabled:
+            return list(ids), list(contents), list(metadata)
+
+        # Texts without any words have no shingles to compare, so each stays on its own
+        shingles = [self._shingles(text) for text in contents]
+        hashed = [i for i, text_shingles in enumerate(shingles) if text_shingles]
+        signatures = (
+            np.stack([self._minhash(shingles[i]) for i in hashed]) if hashed else None
+        )
+        union_find = UnionFind(len(ids))
+        for a, b in self._candidate_pairs(signatures):
+            similarity = np.mean(signatures[a] == signatures[b])
+            if similarity >= self.settings.jaccard_threshold:
+                union_find.union(hashed[a], hashed[b])
+
+        keep, merged_metadata = self._merge(union_find, ids, metadata, stage="text")
+        self.report.text_duplicates += len(ids) - len(keep)
+        return (
+            [ids[i] for i in keep],
+            [contents[i] for i in keep],
+            merged_metadata,
+        )
+
+    def deduplicate_batch(self, batch: RecordBatch) -> RecordBatch:
+        """
+        Merge records whose embeddings are within the cosine similarity threshold.
+
+        Returns:
+            A RecordBatch with the remaining records.
+        """
+        if not self.settings.enabled or not len(batch):
+            return batch
+
+        norms = np.linalg.norm(batch.embeddings, axis=1, keepdims=True)
+        normalized = batch.embeddings / np.maximum(norms, np.finfo(np.float32).eps)
+        union_find = UnionFind(len(batch))
+        block_size = self.settings.block_size
+        for start in range(0, len(batch), block_size):
+            similarities = normalized[start : start + block_size] @ normalized.T
+            rows, columns = np.nonzero(similarities >= self.settings.cosine_threshold)
+            for row, column in zip(rows + start, columns):
+                if column > row:
+                    union_find.union(int(row), int(column))
+
+        keep, merged_metadata = self._merge(
+            union_find, batch.ids, batch.metadata, stage="embedding"
+        )
+        self.report.embedding_duplicates += len(batch) - len(keep)
+        deduplicated = batch.take(keep)
+        deduplicated.metadata = merged_metadata
+        return deduplicated
+
+    def log_report(self) -> None:
+        """Log a summary of the duplicates removed so far."""
+        report = self.report
+        logging.info(
+            f"Deduplication: {report.input_rows} rows in, {report.output_rows} rows out "
+            f"({report.text_duplicates} near-identical texts, "
+            f"{report.embedding_duplicates} near-identical embeddings)"
+        )
+
+    def write_report(self, path: Optional[str] = None) -> None:
+        """
+        Write the report, including every group of merged records, as JSON.
+
+        Args:
+            path: The file to write (default: DeduplicationSettings.report_path).
+        """
+        path = path or self.settings.report_path
+        with open(path, "w") as f:
+            json.dump(self.report.to_dict(), f, indent=2)
+        logging.info(
+            f"Wrote deduplication report with {len(self.report.groups)} groups to {path}"
+        )
+
+    def _shingles(self, text: str) -> List[str]:
+        words = re.findall(r"\w+", text.lower())
+        size = self.settings.shingle_size
+        if not words:
+            return []
+        if len(words) <= size:
+            return [" ".join(words)]
+        return [" ".join(words[i : i + size]) for i in range(len(words) - size + 1)]
+
+    def _minhash(self, shingles: List[str]) -> np.ndarray:
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in set(shingles)),
+            dtype=np.uint64,
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % MINHASH_PRIME
+        return permuted.min(axis=0)
+
+    def _candidate_pairs(self, signatures: Optional[np.ndarray]):
+        """Yield index pairs that share at least one LSH band."""
+        if signatures is None:
+            return
+        rows = self.settings.num_permutations // self.settings.bands
+        seen = set()
+        for band in range(self.settings.bands):
+            buckets = defaultdict(list)
+            band_values = signatures[:, band * rows : (band + 1) * rows]
+            for i, values in enumerate(band_values):
+                buckets[values.tobytes()].append(i)
+            for members in buckets.values():
+                for position, i in enumerate(members):
+                    for j in members[position + 1 :]:
+                        if (i, j) not in seen:
+                            seen.add((i, j))
+                            yield i, j
+
+    def _merge(
+        self,
+        union_find: UnionFind,
+        ids: Sequence[str],
+        metadata: Sequence[dict],
+        stage: str,
+    ) -> Tuple[List[int], List[dict]]:
+        """Pick the first record of every group and aggregate the group's metadata into it."""
+        keep, merged_metadata = [], []
+        for root, members in sorted(union_find.groups().items()):
+            keep.append(root)
+            if len(members) == 1:
+                merged_metadata.append(metadata[root])
+                continue
+
+            merged = dict(metadata[root])
+            merged["duplicate_count"] = merged.get("duplicate_count", 0) + sum(
+                metadata[i].get("duplicate_count", 0) + 1 for i in members[1:]
+            )
+            # A member merged in an earlier pass carries its own variants; take the
+            # union of those with the plain values of the others.
+            variants = {}
+            keys = {key for i in members for key in metadata[i]} | {
+                key for i in members for key in metadata[i].get("variants", {})
+            }
+            for key in keys - {"duplicate_count", "variants", "created_at"}:
+                values = []
+                for i in members:
+                    member_values = metadata[i].get("variants", {}).get(
+                        key, [metadata[i].get(key)]
+                    )
+                    for value in member_values:
+                        if value not in values:
+                            values.append(value)
+                if len(values) > 1:
+                    variants[key] = values
+            if variants:
+                merged["variants"] = variants
+            merged_metadata.append(merged)
+
+            self.report.groups.append(
+                DuplicateGroup(
+                    stage=stage,
+                    canonical_id=str(ids[root]),
+                    duplicate_ids=[str(ids[i]) for i in members[1:]],
+                )
+            )
+        return keep, merged_metadata
@@ -1,15 +1,33 @@
-from typing import List
+import base64
+from typing import List, Optional, Union
+
+import numpy as np
 from config.settings import get_settings
 import services.embedding_model_registrations as embedding_model_registrations
+from services.rate_limiter import estimate_tokens, get_rate_limiter
 
 
 class EmbeddingModelFactory:
-    def __init__(self, provider: str):
+    def __init__(self, provider: str, timeout: Optional[float] = None):
+        """
+        Args:
+            provider: The name of a registered embedding model client.
+            timeout: Bound each request to this many seconds. The provider SDK is
+                configured to give up after it without retrying, and throttled calls
+                are not retried either, so the caller can fall back elsewhere.
+        """
         self.provider = provider
         self.settings = getattr(get_settings(), provider)
+        self.max_retries: Optional[int] = None
+        if timeout is not None:
+            self.settings = self.settings.model_copy(
+                update={"timeout": timeout, "max_retries": 0}
+            )
+            self.max_retries = 0
         self.client = embedding_model_registrations.get_embedding_model_client(
             self.provider
         )(self.settings)
+        self.rate_limiter = get_rate_limiter(self.provider, self.settings.rate_limit)
 
     def create_embedding(self, text: str, **kwargs) -> List[float]:
         """
@@ -20,4 +38,45 @@ class EmbeddingModelFactory:
             "input": [text],
         }
 
-        return self.client.embeddings.create(**embedding_params).data[0].embedding
+        return self.rate_limiter.call(
+            lambda: self.client.embeddings.create(**embedding_params).data[0].embedding,
+            tokens=estimate_tokens(text),
+            max_retries=self.max_retries,
+        )
+
+    def create_embeddings(self, texts: List[str], **kwargs) -> np.ndarray:
+        """
+        Generate embeddings for a list of texts, in requests of at most `batch_size` texts.
+
+        Returns:
+            A 2-D float32 array with one row per text. Empty input gives an array of
+            shape (0, VectorStoreSettings.embedding_dimensions).
+        """
+        model = kwargs.get("model", self.settings.default_model)
+        batch_size = self.settings.batch_size
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start : start + batch_size]
+            embedding_params = {"model": model, "input": batch}
+            if self.settings.encoding_format:
+                embedding_params["encoding_format"] = self.settings.encoding_format
+
+            response = self.rate_limiter.call(
+                lambda: self.client.embeddings.create(**embedding_params),
+                tokens=sum(estimate_tokens(text) for text in batch),
+                max_retries=self.max_retries,
+            )
+            batches.append(
+                np.stack([self._decode_embedding(item.embedding) for item in response.data])
+            )
+        if not batches:
+            dimensions = get_settings().vector_store.embedding_dimensions
+            return np.empty((0, dimensions), dtype=np.float32)
+        return np.concatenate(batches)
+
+    @staticmethod
+    def _decode_embedding(embedding: Union[str, List[float]]) -> np.ndarray:
+        """Decode a base64 float32 embedding, or convert a list of floats, to a float32 array."""
+        if isinstance(embedding, str):
+            return np.frombuffer(base64.b64decode(embedding), dtype="<f4")
+        return np.asarray(embedding, dtype=np.float32)
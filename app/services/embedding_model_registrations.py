@@ -1,4 +1,7 @@
-from openai import OpenAI
+from botocore.config import Config
+from openai import DefaultHttpxClient, OpenAI
+from services.rate_limiter import http_response_hook, register_botocore_response_hook
+from services.stub_clients import LatencyInjector, StubEmbeddingClient
 from services.titan_embeddings import TitanEmbeddings
 
 ####################
@@ -39,6 +42,23 @@ def get_embedding_model_client(embedding_model_client):
 # as this module is imported. There is no need to touch the EmbeddingModelFactory class.
 
 
+def openai_client_params(provider, settings):
+    """
+    Parameters for an OpenAI client: timeouts and retries where the settings give them,
+    and an HTTP client that passes rate limit headers to the provider's rate limiter.
+    """
+    params = {
+        "http_client": DefaultHttpxClient(
+            event_hooks={"response": [http_response_hook(provider, settings.rate_limit)]}
+        )
+    }
+    if settings.timeout is not None:
+        params["timeout"] = settings.timeout
+    if settings.max_retries is not None:
+        params["max_retries"] = settings.max_retries
+    return params
+
+
 @register_embedding_model_client("openai_embedding_model")
 def openai_embedding_model_client(settings):
     """
@@ -51,6 +71,7 @@ def openai_embedding_model_client(settings):
     return OpenAI(
         base_url=settings.base_url,
         api_key=settings.api_key,
+        **openai_client_params("openai_embedding_model", settings),
     )
 
 
@@ -67,6 +88,7 @@ def llama_embedding_model_client(settings):
     return OpenAI(
         base_url=settings.base_url,
         api_key=settings.api_key,  # required, but unused
+        **openai_client_params("llama_embedding_model", settings),
     )
 
 
@@ -89,7 +111,62 @@ def bedrock_embedding_model_client(settings):
         "region_name": settings.region,
     }
 
+    config_params = {}
+    if settings.timeout is not None:
+        config_params["connect_timeout"] = settings.timeout
+        config_params["read_timeout"] = settings.timeout
+    if settings.max_retries is not None:
+        config_params["retries"] = {"max_attempts": settings.max_retries}
+    if config_params:
+        bedrock_params["config"] = Config(**config_params)
+
     print(f"Settings: {settings}")
     print(f"Using embedding model: {settings.default_model}")
 
-    return EmbeddingsWrapper(model_id=settings.default_model, **bedrock_params)
+    wrapper = EmbeddingsWrapper(model_id=settings.default_model, **bedrock_params)
+    register_botocore_response_hook(
+        wrapper.embeddings.bedrock, "bedrock_embedding_model", settings.rate_limit
+    )
+    return wrapper
+
+
+@register_embedding_model_client("stub_embedding_model")
+def stub_embedding_model_client(settings):
+    """
+    Create a local stub embedding model client with deterministic output, for tests and development.
+    """
+    latency = LatencyInjector(
+        latency_ms=settings.latency_ms,
+        jitter_ms=settings.latency_jitter_ms,
+        error_rate=settings.error_rate,
+    )
+    return StubEmbeddingClient(dimensions=settings.dimensions, latency=latency)
+
+
+@register_embedding_model_client("onnx_embedding_model")
+def onnx_embedding_model_client(settings):
+    """
+    Create a local ONNX embedding model client that runs in-process on the CPU.
+    onnxruntime and tokenizers are only imported when this client is used.
+    """
+    from services.onnx_embeddings import OnnxEmbeddings
+
+    class EmbeddingsWrapper:
+        def __init__(self, embeddings):
+            self.embeddings = embeddings
+
+    print(f"Using embedding model: {settings.default_model} from {settings.model_path}")
+
+    return EmbeddingsWrapper(
+        OnnxEmbeddings(
+            model_path=settings.model_path,
+            tokenizer_path=settings.tokenizer_path,
+            max_length=settings.max_length,
+            normalize=settings.normalize,
+            pooling=settings.pooling,
+            intra_op_threads=settings.intra_op_threads,
+            max_batch_size=settings.max_batch_size,
+            max_wait_ms=settings.max_wait_ms,
+            num_workers=settings.num_workers,
+        )
+    )
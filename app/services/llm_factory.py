@@ -1,7 +1,9 @@
-from typing import Any, Dict, List, Type
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Type
 from pydantic import BaseModel
 from config.settings import get_settings
 import services.llm_registrations as llm_registrations
+from services.rate_limiter import estimate_tokens, get_rate_limiter
 
 
 class LLMFactory:
@@ -9,12 +11,43 @@ class LLMFactory:
         self.provider = provider
         self.settings = getattr(get_settings(), provider)
         self.client = llm_registrations.get_llm_client(self.provider)(self.settings)
+        self.rate_limiter = get_rate_limiter(self.provider, self.settings.rate_limit)
 
     def create_completion(
         self, response_model: Type[BaseModel], messages: List[Dict[str, str]], **kwargs
     ) -> Any:
         print(f"Using LLM: {kwargs.get('model', self.settings.default_model)}")
-        completion_params = {
+        completion_params = self._completion_params(response_model, messages, **kwargs)
+        tokens = self._estimate_tokens(completion_params)
+        return self.rate_limiter.call(
+            lambda: self.client.chat.completions.create(**completion_params),
+            tokens=tokens,
+        )
+
+    def create_partial_completion(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, str]], **kwargs
+    ) -> Iterator[BaseModel]:
+        """
+        Stream partially populated response models as the completion is generated.
+
+        The rate limiter covers the request up to its first partial response.
+        """
+        completion_params = self._completion_params(response_model, messages, **kwargs)
+        tokens = self._estimate_tokens(completion_params)
+
+        def start_stream():
+            stream = self.client.chat.completions.create_partial(**completion_params)
+            return next(stream, None), stream
+
+        first, stream = self.rate_limiter.call(start_stream, tokens=tokens)
+        if first is not None:
+            yield first
+            yield from stream
+
+    def _completion_params(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, str]], **kwargs
+    ) -> Dict[str, Any]:
+        return {
             "model": kwargs.get("model", self.settings.default_model),
             "temperature": kwargs.get("temperature", self.settings.temperature),
             "max_retries": kwargs.get("max_retries", self.settings.max_retries),
@@ -22,4 +55,15 @@ class LLMFactory:
             "response_model": response_model,
             "messages": messages,
         }
-        return self.client.chat.completions.create(**completion_params)
+
+    @staticmethod
+    def _estimate_tokens(completion_params: Dict[str, Any]) -> int:
+        """Estimate prompt plus maximum completion tokens, for the rate limiter."""
+        tokens = sum(estimate_tokens(m["content"]) for m in completion_params["messages"])
+        return tokens + (completion_params["max_tokens"] or 0)
+
+
+@lru_cache()
+def get_llm_factory(provider: str) -> LLMFactory:
+    """Create and return a cached LLMFactory, so its client is shared across calls."""
+    return LLMFactory(provider)
@@ -1,6 +1,8 @@
 import anthropic
 import instructor
-from openai import OpenAI
+from openai import DefaultHttpxClient, OpenAI
+from services.rate_limiter import http_response_hook
+from services.stub_clients import LatencyInjector, StubLLMClient
 
 ####################
 # This is where we register the LLM clients that can be used by the LLMFactory.
@@ -35,6 +37,16 @@ def get_llm_client(llm_client):
         raise ValueError(f"LLM client '{llm_client}' is not registered.")
 
 
+def rate_limited_http_client(http_client_class, provider, settings):
+    """
+    Create the SDK's default HTTP client, with a hook that passes rate limit headers
+    from every response to the provider's rate limiter.
+    """
+    return http_client_class(
+        event_hooks={"response": [http_response_hook(provider, settings.rate_limit)]}
+    )
+
+
 # Register LLM clients
 # Add your LLM client registration functions here and they will be automatically registered
 # as this module is imported. There is no need to touch the LLMFactory class.
@@ -45,7 +57,12 @@ def openai_client(settings):
     """
     Create an OpenAI LLM client.
     """
-    return instructor.from_openai(OpenAI(api_key=settings.api_key))
+    return instructor.from_openai(
+        OpenAI(
+            api_key=settings.api_key,
+            http_client=rate_limited_http_client(DefaultHttpxClient, "openai", settings),
+        )
+    )
 
 
 @register_llm_client("anthropic")
@@ -53,7 +70,14 @@ def anthropic_client(settings):
     """
     Create an Anthropic LLM client.
     """
-    return instructor.from_anthropic(anthropic.Anthropic(api_key=settings.api_key))
+    return instructor.from_anthropic(
+        anthropic.Anthropic(
+            api_key=settings.api_key,
+            http_client=rate_limited_http_client(
+                anthropic.DefaultHttpxClient, "anthropic", settings
+            ),
+        )
+    )
 
 
 @register_llm_client("llama")
@@ -63,7 +87,11 @@ def llama_client(settings):
     Note that Ollama is OpenAI compatible, so we can continue use the OpenAI client.
     """
     return instructor.from_openai(
-        OpenAI(base_url=settings.base_url, api_key=settings.api_key),
+        OpenAI(
+            base_url=settings.base_url,
+            api_key=settings.api_key,
+            http_client=rate_limited_http_client(DefaultHttpxClient, "llama", settings),
+        ),
         mode=instructor.Mode.JSON,
     )
 
@@ -78,7 +106,23 @@ def bedrock_client(settings):
         aws_secret_key=settings.secret_key,
         aws_session_token=settings.session_token,
         aws_region=settings.region,
+        http_client=rate_limited_http_client(
+            anthropic.DefaultHttpxClient, "bedrock", settings
+        ),
     )
 
     instructor_client = instructor.from_anthropic(client)
     return instructor_client
+
+
+@register_llm_client("stub")
+def stub_client(settings):
+    """
+    Create a local stub LLM client with deterministic output, for tests and development.
+    """
+    latency = LatencyInjector(
+        latency_ms=settings.latency_ms,
+        jitter_ms=settings.latency_jitter_ms,
+        error_rate=settings.error_rate,
+    )
+    return StubLLMClient(latency=latency)
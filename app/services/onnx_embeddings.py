@@ -0,0 +1,185 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import onnxruntime as ort
+from services.titan_embeddings import EmbeddingResponse
+from tokenizers import Tokenizer
+
+####################
+# In-process embedding model for CPU inference with ONNX Runtime.
+# Query embeddings skip the network round trip to a hosted provider, and
+# concurrent requests are micro-batched so throughput holds up under load.
+####################
+
+POOLING_MODES = ("cls", "mean")
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent embedding requests into batched model runs.
+
+    Requests are queued and a dispatcher thread hands them to a pool of
+    `num_workers` threads. A batch is dispatched as soon as a worker is free, so a
+    lone query isn't delayed; while all workers are busy, requests accumulate and
+    go out together in the next batch of up to `max_batch_size` texts. Setting
+    `max_wait_ms` holds each batch open a little longer to collect more requests.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 0.0,
+        num_workers: int = 2,
+    ):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = ThreadPoolExecutor(
+            max_workers=num_workers, thread_name_prefix="onnx"
+        )
+        self._free_workers = threading.Semaphore(num_workers)
+        self._queue: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._dispatcher = threading.Thread(
+            target=self._dispatch, name="onnx-batcher", daemon=True
+        )
+        self._dispatcher.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """Queue texts for embedding; the future resolves to an array with one row per text."""
+        future: Future = Future()
+        self._queue.put((texts, future))
+        return future
+
+    def _dispatch(self) -> None:
+        while True:
+            requests = [self._queue.get()]
+            self._free_workers.acquire()
+            size = len(requests[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch_size:
+                try:
+                    remaining = deadline - time.monotonic()
+                    if remaining > 0:
+                        request = self._queue.get(timeout=remaining)
+                    else:
+                        request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                requests.append(request)
+                size += len(request[0])
+            self.executor.submit(self._run, requests)
+
+    def _run(self, requests: List[Tuple[List[str], Future]]) -> None:
+        try:
+            texts = [text for request_texts, _ in requests for text in request_texts]
+            try:
+                embeddings = self.run_batch(texts)
+            except Exception as e:
+                for _, future in requests:
+                    future.set_exception(e)
+                return
+
+            start = 0
+            for request_texts, future in requests:
+                future.set_result(embeddings[start : start + len(request_texts)])
+                start += len(request_texts)
+        finally:
+            self._free_workers.release()
+
+
+class OnnxEmbeddings:
+    """
+    In-process sentence embeddings from an ONNX model on the CPU.
+
+    Works with sentence-transformer style models exported to ONNX that take
+    `input_ids` and `attention_mask` (and optionally `token_type_ids`). If the model
+    outputs token embeddings they are pooled as the model was trained: `"cls"` takes
+    the first token's embedding, `"mean"` averages them over the attention mask. A
+    model that already outputs one vector per input is used as is.
+
+    Concurrent calls to `create` are micro-batched into shared inference runs.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        tokenizer_path: Optional[str] = None,
+        max_length: int = 512,
+        normalize: bool = True,
+        pooling: str = "cls",
+        intra_op_threads: int = 0,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 0.0,
+        num_workers: int = 2,
+    ):
+        if pooling not in POOLING_MODES:
+            raise ValueError(
+                f"Unknown pooling '{pooling}', expected one of {', '.join(POOLING_MODES)}"
+            )
+        self.pooling = pooling
+        tokenizer_path = tokenizer_path or os.path.join(
+            os.path.dirname(model_path), "tokenizer.json"
+        )
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+        self.normalize = normalize
+
+        session_options = ort.SessionOptions()
+        session_options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(
+            model_path, session_options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.batcher = MicroBatcher(
+            self.embed_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            num_workers=num_workers,
+        )
+        logging.info(f"Loaded ONNX embedding model from {model_path}")
+
+    def create(self, model: str, input: List[str], **kwargs) -> EmbeddingResponse:
+        """
+        Returns embeddings in the same response shape as the OpenAI client.
+        Each embedding is a float32 NumPy array, which the EmbeddingModelFactory
+        takes as is rather than converting it to and from a list of floats.
+        Args:
+            model (str): unused, the model is the one loaded from disk
+            input (list): list of texts to embed
+        Return:
+            EmbeddingResponse: Embedding response object
+        """
+        embeddings = self.batcher.submit(list(input)).result()
+        return EmbeddingResponse(*embeddings)
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Run the model on a batch of texts and return a 2-D float32 array."""
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            inputs["token_type_ids"] = np.array(
+                [e.type_ids for e in encodings], dtype=np.int64
+            )
+
+        output = self.session.run(None, inputs)[0]
+        if output.ndim == 3 and self.pooling == "cls":
+            output = output[:, 0]
+        elif output.ndim == 3:
+            mask = attention_mask[:, :, np.newaxis].astype(np.float32)
+            output = (output * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+        embeddings = output.astype(np.float32, copy=False)
+        if self.normalize:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.maximum(norms, 1e-12)
+        return embeddings
@@ -0,0 +1,375 @@
+import logging
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional, TypeVar
+
+from config.rate_limit_settings import RateLimitSettings
+
+T = TypeVar("T")
+
+####################
+# Client-side rate limiting shared by the EmbeddingModelFactory and the LLMFactory.
+# Every provider gets a single ProviderRateLimiter, so all calls to the same provider
+# in this process draw from the same request/token budget and concurrency limit.
+####################
+
+THROTTLING_ERROR_CODES = {"ThrottlingException", "TooManyRequestsException"}
+
+RATE_LIMITERS: Dict[str, "ProviderRateLimiter"] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+class TokenBucket:
+    """A thread-safe token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Block until `amount` tokens are available and take them.
+
+        Returns:
+            The number of seconds spent waiting.
+        """
+        # A single request larger than the bucket would otherwise wait forever.
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = max(
+                    self.paused_until - now, (amount - self.tokens) / self.rate
+                )
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for the given number of seconds.
+
+        Tokens already in the bucket are kept, but none are added until the pause ends.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.paused_until = max(self.paused_until, now + seconds)
+
+    def _refill(self, now: float) -> None:
+        # No tokens accrue while paused.
+        refill_from = max(self.updated_at, min(self.paused_until, now))
+        self.tokens = min(
+            self.capacity, self.tokens + (now - refill_from) * self.rate
+        )
+        self.updated_at = now
+
+
+class AIMDConcurrencyLimiter:
+    """
+    Concurrency limit with additive increase and multiplicative decrease.
+
+    Every successful call grows the limit by 1/limit, i.e. by one slot per full
+    window of successes. A throttled call multiplies the limit by `decrease_factor`,
+    at most once per `decrease_cooldown` seconds so a burst of throttles doesn't
+    collapse it.
+    """
+
+    def __init__(self, settings: RateLimitSettings):
+        self.settings = settings
+        self.limit = float(settings.initial_concurrency)
+        self.in_flight = 0
+        self._last_decrease_at = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, throttled: bool = False) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                if now - self._last_decrease_at >= self.settings.decrease_cooldown:
+                    self.limit = max(
+                        float(self.settings.min_concurrency),
+                        self.limit * self.settings.decrease_factor,
+                    )
+                    self._last_decrease_at = now
+            else:
+                self.limit = min(
+                    float(self.settings.max_concurrency), self.limit + 1.0 / self.limit
+                )
+            self._condition.notify_all()
+
+
+class ProviderRateLimiter:
+    """Rate limiter, adaptive concurrency controller and throughput meter for a provider."""
+
+    def __init__(self, provider: str, settings: RateLimitSettings):
+        self.provider = provider
+        self.settings = settings
+        self.concurrency = AIMDConcurrencyLimiter(settings)
+        self.request_bucket = (
+            TokenBucket(settings.requests_per_minute)
+            if settings.requests_per_minute
+            else None
+        )
+        self.token_bucket = (
+            TokenBucket(settings.tokens_per_minute)
+            if settings.tokens_per_minute
+            else None
+        )
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self._started_at: Optional[float] = None
+        self._requests = 0
+        self._tokens = 0
+        self._throttled = 0
+        self._errors = 0
+        self._waited = 0.0
+
+    def call(
+        self, fn: Callable[[], T], tokens: int = 0, max_retries: Optional[int] = None
+    ) -> T:
+        """
+        Call `fn` within the provider's rate limits, retrying when throttled.
+
+        Args:
+            fn: The provider call to make.
+            tokens: Estimated number of tokens the call consumes.
+            max_retries: Override RateLimitSettings.max_retries, e.g. 0 for calls
+                bound by a deadline that should fail fast rather than back off.
+
+        Returns:
+            The result of `fn`.
+        """
+        with self._lock:
+            if self._started_at is None:
+                self._started_at = time.monotonic()
+
+        if max_retries is None:
+            max_retries = self.settings.max_retries
+
+        for attempt in range(max_retries + 1):
+            waited = self._wait_for_budget(tokens)
+            self.concurrency.acquire()
+            try:
+                result = fn()
+            except Exception as e:
+                throttled = is_throttling_error(e)
+                self.concurrency.release(throttled=throttled)
+                with self._lock:
+                    self._waited += waited
+                    if throttled:
+                        self._throttled += 1
+                    else:
+                        self._errors += 1
+                if not throttled or attempt == max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+                logging.warning(
+                    f"{self.provider} throttled (attempt {attempt + 1}), "
+                    f"backing off {delay:.2f} seconds"
+                )
+                # The next attempt waits for the pause in _wait_for_budget
+                self._pause(delay)
+                continue
+
+            self.concurrency.release()
+            with self._lock:
+                self._waited += waited
+                self._requests += 1
+                self._tokens += tokens
+            return result
+
+    def _wait_for_budget(self, tokens: int) -> float:
+        waited = 0.0
+        while (delay := self._paused_until - time.monotonic()) > 0:
+            time.sleep(delay)
+            waited += delay
+        if self.request_bucket:
+            waited += self.request_bucket.acquire()
+        if self.token_bucket and tokens:
+            waited += self.token_bucket.acquire(tokens)
+        return waited
+
+    def _pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        for bucket in (self.request_bucket, self.token_bucket):
+            if bucket:
+                bucket.pause(seconds)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Use the provider's retry hint if there is one, else exponential backoff with jitter."""
+        hinted = retry_after_from_headers(response_headers(error))
+        if hinted is not None:
+            return min(hinted, self.settings.max_backoff)
+        backoff = self.settings.initial_backoff * 2**attempt
+        return min(backoff, self.settings.max_backoff) * random.uniform(0.5, 1.0)
+
+    def observe_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Adjust to rate limit headers from a provider response.
+
+        When the provider reports that the remaining request or token budget is
+        exhausted, calls are paused until the reported reset time, for at most
+        RateLimitSettings.max_backoff seconds.
+        """
+        retry_after = retry_after_from_headers(headers)
+        if retry_after is not None:
+            self._pause(min(retry_after, self.settings.max_backoff))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return achieved throughput and throttling counts since the first call."""
+        with self._lock:
+            elapsed = (
+                time.monotonic() - self._started_at if self._started_at else 0.0
+            )
+            minutes = elapsed / 60.0
+            return {
+                "provider": self.provider,
+                "requests": self._requests,
+                "tokens": self._tokens,
+                "throttled": self._throttled,
+                "errors": self._errors,
+                "elapsed_seconds": round(elapsed, 3),
+                "requests_per_minute": round(self._requests / minutes, 1) if minutes else 0.0,
+                "tokens_per_minute": round(self._tokens / minutes, 1) if minutes else 0.0,
+                "concurrency_limit": int(self.concurrency.limit),
+                "seconds_waiting_for_budget": round(self._waited, 3),
+            }
+
+
+def get_rate_limiter(provider: str, settings: RateLimitSettings) -> ProviderRateLimiter:
+    """
+    Retrieve the rate limiter for a provider, creating it on first use.
+    """
+    with _rate_limiters_lock:
+        if provider not in RATE_LIMITERS:
+            RATE_LIMITERS[provider] = ProviderRateLimiter(provider, settings)
+        return RATE_LIMITERS[provider]
+
+
+def http_response_hook(provider: str, settings: RateLimitSettings) -> Callable[[Any], None]:
+    """
+    An httpx response event hook that passes the rate limit headers of every response
+    from a provider to its rate limiter, so calls are paused as soon as the provider
+    reports an exhausted budget rather than after it starts returning 429s.
+    """
+    rate_limiter = get_rate_limiter(provider, settings)
+
+    def hook(response: Any) -> None:
+        rate_limiter.observe_headers(response.headers)
+
+    return hook
+
+
+def register_botocore_response_hook(
+    boto_client: Any, provider: str, settings: RateLimitSettings
+) -> None:
+    """Pass the headers of every response of a boto3 client to the provider's rate limiter."""
+    rate_limiter = get_rate_limiter(provider, settings)
+
+    def hook(parsed: Optional[Dict[str, Any]] = None, **kwargs) -> None:
+        headers = (parsed or {}).get("ResponseMetadata", {}).get("HTTPHeaders", {})
+        rate_limiter.observe_headers(headers)
+
+    service = boto_client.meta.service_model.service_name
+    boto_client.meta.events.register(f"after-call.{service}", hook)
+
+
+def log_rate_limiter_stats() -> None:
+    """Log the achieved throughput of every provider used in this process."""
+    for rate_limiter in RATE_LIMITERS.values():
+        logging.info(f"Rate limiter stats: {rate_limiter.stats()}")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token) for budgeting."""
+    return len(text) // 4 + 1
+
+
+def _error_chain(error: Optional[BaseException]):
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """
+    Whether an error (or any error it was raised from) is a provider throttling response.
+
+    Recognises HTTP 429 responses from the OpenAI and Anthropic SDKs and throttling
+    error codes from botocore (Bedrock).
+    """
+    for e in _error_chain(error):
+        if getattr(e, "status_code", None) == 429:
+            return True
+        response = getattr(e, "response", None)
+        if isinstance(response, dict):
+            if response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES:
+                return True
+    return False
+
+
+def response_headers(error: Exception) -> Mapping[str, str]:
+    """Extract HTTP response headers from an SDK error, if it carries any."""
+    for e in _error_chain(error):
+        response = getattr(e, "response", None)
+        if isinstance(response, dict):
+            return response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+        headers = getattr(response, "headers", None)
+        if headers is not None:
+            return headers
+    return {}
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse durations such as '20ms', '1s' or '6m0s' as used in x-ratelimit-reset-* headers."""
+    units = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    parts = re.findall(r"([\d.]+)(ms|s|m|h)", value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+
+def retry_after_from_headers(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Work out how long to wait from rate limit headers.
+
+    Returns:
+        The number of seconds to wait, or None if the headers don't say.
+    """
+    headers = {k.lower(): v for k, v in headers.items()}
+    if "retry-after-ms" in headers:
+        return _parse_duration(headers["retry-after-ms"] + "ms")
+    if "retry-after" in headers:
+        return _parse_duration(headers["retry-after"])
+
+    waits = [
+        _parse_duration(headers.get(f"x-ratelimit-reset-{kind}", ""))
+        for kind in ("requests", "tokens")
+        if headers.get(f"x-ratelimit-remaining-{kind}") == "0"
+    ]
+    waits = [w for w in waits if w is not None]
+    return max(waits) if waits else None
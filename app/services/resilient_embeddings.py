@@ -0,0 +1,265 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Deque, List, Optional, Set, TypeVar
+
+import numpy as np
+from config.embedding_model_settings import ResilientEmbeddingModelSettings
+from config.settings import get_settings
+from services.embedding_model_factory import EmbeddingModelFactory
+
+T = TypeVar("T")
+
+# EMBEDDING_MODEL_CLIENT value that selects the ResilientEmbeddingModel
+RESILIENT_EMBEDDING_MODEL = "resilient_embedding_model"
+
+
+class CircuitBreaker:
+    """
+    Error-rate circuit breaker for a single provider.
+
+    The breaker opens once at least `min_calls` outcomes have been recorded and the
+    error rate over the last `window` calls reaches `error_rate`. After `cooldown`
+    seconds a single trial call is let through; its outcome closes or re-opens it.
+    """
+
+    def __init__(self, error_rate: float, min_calls: int, window: int, cooldown: float):
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._opened_at: Optional[float] = None
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        """Return whether a call may be made right now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_in_progress:
+                return False
+            if time.monotonic() - self._opened_at >= self.cooldown:
+                self._trial_in_progress = True
+                return True
+            return False
+
+    def record(self, success: bool) -> None:
+        """Record the outcome of a call."""
+        with self._lock:
+            if self._trial_in_progress:
+                self._trial_in_progress = False
+                if success:
+                    self._opened_at = None
+                    self._outcomes.clear()
+                else:
+                    self._opened_at = time.monotonic()
+                return
+
+            self._outcomes.append(success)
+            errors = self._outcomes.count(False)
+            if (
+                len(self._outcomes) >= self.min_calls
+                and errors / len(self._outcomes) >= self.error_rate
+            ):
+                self._opened_at = time.monotonic()
+
+
+class ProviderState:
+    """
+    An embedding provider together with its latency history, breaker and worker threads.
+
+    Each provider has its own executor, so calls stuck on a slow provider can't hold up
+    the fallback providers behind them. Its SDK requests are bounded by the deadline.
+    """
+
+    def __init__(self, name: str, settings: ResilientEmbeddingModelSettings):
+        self.name = name
+        self.dimensions_mismatch = False
+        self.factory = EmbeddingModelFactory(name, timeout=settings.timeout)
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.max_workers,
+            thread_name_prefix=f"embedding-{name}",
+        )
+        self.latencies: Deque[float] = deque(maxlen=settings.latency_window)
+        self.breaker = CircuitBreaker(
+            error_rate=settings.breaker_error_rate,
+            min_calls=settings.breaker_min_calls,
+            window=settings.breaker_window,
+            cooldown=settings.breaker_cooldown,
+        )
+
+
+class ResilientEmbeddingModel:
+    """
+    Embedding client that bounds tail latency across one or more providers.
+
+    Each call runs with a deadline. If the first request has not returned after
+    the provider's observed latency percentile, a duplicate (hedged) request is
+    sent and whichever finishes first wins. Providers that time out or fail are
+    skipped in favour of the next one in the chain, and a circuit breaker stops
+    calling providers with a high recent error rate.
+
+    Hedging trades a small amount of extra provider usage for lower p99 latency.
+    All providers in the chain must produce embeddings of the same dimension; a
+    provider whose first result has the wrong dimension is treated as failed and
+    taken out of the chain.
+    """
+
+    def __init__(
+        self,
+        providers: Optional[List[str]] = None,
+        settings: Optional[ResilientEmbeddingModelSettings] = None,
+    ):
+        self.settings = settings or get_settings().resilient_embedding_model
+        self.dimensions = get_settings().vector_store.embedding_dimensions
+        provider_names = providers or self.settings.providers
+        if not provider_names:
+            raise ValueError("At least one embedding model provider is required.")
+
+        self.providers = [ProviderState(name, self.settings) for name in provider_names]
+
+    def create_embedding(self, text: str, **kwargs) -> List[float]:
+        """
+        Generate an embedding for the given text, falling back across providers.
+
+        Raises:
+            ValueError: If the last available provider returned the wrong dimension.
+            TimeoutError: If the last available provider missed its deadline.
+            RuntimeError: If every provider's circuit breaker is open.
+        """
+        return self._with_fallback(
+            lambda provider: self._hedged_call(provider, text, **kwargs),
+            dimensions_of=len,
+        )
+
+    def create_embeddings(self, texts: List[str], **kwargs) -> np.ndarray:
+        """
+        Generate embeddings for a list of texts, falling back across providers.
+
+        Batch calls are not hedged, since they are used for ingestion rather than
+        queries, and each has a deadline of ResilientEmbeddingModelSettings.batch_timeout.
+
+        Raises:
+            ValueError: If the last available provider returned the wrong dimension.
+            TimeoutError: If the last available provider missed its deadline.
+            RuntimeError: If every provider's circuit breaker is open.
+        """
+        return self._with_fallback(
+            lambda provider: self._deadline_call(provider, texts, **kwargs),
+            dimensions_of=lambda embeddings: embeddings.shape[1],
+        )
+
+    def _with_fallback(
+        self,
+        call: Callable[[ProviderState], T],
+        dimensions_of: Callable[[T], int],
+    ) -> T:
+        last_error: Optional[Exception] = None
+        for provider in self.providers:
+            if provider.dimensions_mismatch:
+                continue
+            if not provider.breaker.allow():
+                logging.info(f"Circuit open for {provider.name}, skipping")
+                continue
+
+            try:
+                result = call(provider)
+                dimensions = dimensions_of(result)
+                if dimensions != self.dimensions:
+                    # A model's dimension never changes, so stop using the provider.
+                    provider.dimensions_mismatch = True
+                    raise ValueError(
+                        f"Embedding model provider '{provider.name}' returned "
+                        f"{dimensions} dimensions, expected {self.dimensions}"
+                    )
+            except Exception as e:
+                provider.breaker.record(success=False)
+                logging.warning(f"Embedding call to {provider.name} failed: {e!r}")
+                last_error = e
+                continue
+
+            provider.breaker.record(success=True)
+            return result
+
+        if last_error is not None:
+            raise last_error
+        raise RuntimeError("All embedding model providers are unavailable.")
+
+    def _hedge_delay(self, provider: ProviderState) -> Optional[float]:
+        """Delay after which to send a hedged request, or None if not enough data."""
+        latencies = sorted(provider.latencies)
+        if len(latencies) < self.settings.hedge_min_samples:
+            return None
+        index = round(self.settings.hedge_percentile / 100 * (len(latencies) - 1))
+        return max(latencies[index], self.settings.hedge_min_delay)
+
+    def _timed_call(self, provider: ProviderState, text: str, **kwargs) -> List[float]:
+        start_time = time.monotonic()
+        embedding = provider.factory.create_embedding(text, **kwargs)
+        provider.latencies.append(time.monotonic() - start_time)
+        return embedding
+
+    def _deadline_call(
+        self, provider: ProviderState, texts: List[str], **kwargs
+    ) -> np.ndarray:
+        future = provider.executor.submit(
+            provider.factory.create_embeddings, texts, **kwargs
+        )
+        try:
+            return future.result(timeout=self.settings.batch_timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(
+                f"Batch embedding call to {provider.name} exceeded "
+                f"{self.settings.batch_timeout} seconds"
+            )
+
+    def _hedged_call(self, provider: ProviderState, text: str, **kwargs) -> List[float]:
+        deadline = time.monotonic() + self.settings.timeout
+        pending = {provider.executor.submit(self._timed_call, provider, text, **kwargs)}
+
+        hedge_delay = self._hedge_delay(provider)
+        if hedge_delay is not None and hedge_delay < self.settings.timeout:
+            done, _ = wait(pending, timeout=hedge_delay)
+            if not done:
+                logging.info(
+                    f"Sending hedged embedding request to {provider.name} "
+                    f"after {hedge_delay:.3f} seconds"
+                )
+                pending.add(
+                    provider.executor.submit(self._timed_call, provider, text, **kwargs)
+                )
+
+        error: Optional[Exception] = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self._cancel(pending)
+                    return future.result()
+                error = future.exception()
+
+        self._cancel(pending)
+        if error is not None and not pending:
+            raise error
+        raise TimeoutError(
+            f"Embedding call to {provider.name} exceeded {self.settings.timeout} seconds"
+        )
+
+    @staticmethod
+    def _cancel(futures: Set[Future]) -> None:
+        # Calls that are already running cannot be interrupted; their results are
+        # discarded, and the SDK timeout stops them shortly after the deadline.
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,127 @@
+import hashlib
+import time
+import typing
+from typing import Any, Dict, Iterator, List, Optional, Type
+
+import numpy as np
+from pydantic import BaseModel
+from services.titan_embeddings import EmbeddingResponse
+
+####################
+# Local stand-ins for the embedding and LLM providers.
+# They need no network access or credentials and always return the same output
+# for the same input, which makes them suitable for tests, load tests and local
+# development. Latency and failures can be injected, also deterministically.
+####################
+
+
+class StubProviderError(Exception):
+    """A failure injected by a stub provider."""
+
+
+def _unit_values(text: str, count: int) -> List[float]:
+    """Derive `count` values in [0, 1) from a hash of the text."""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8 * count).digest()
+    return [
+        int.from_bytes(digest[i * 8 : (i + 1) * 8], "big") / 2**64 for i in range(count)
+    ]
+
+
+class LatencyInjector:
+    """
+    Adds latency, and optionally failures, that depend only on the request content.
+
+    Each request takes `latency_ms` plus up to `jitter_ms`, and fails with a
+    StubProviderError for a fraction `error_rate` of distinct inputs.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+
+    def __call__(self, text: str) -> None:
+        jitter, failure = _unit_values(text, 2)
+        delay_ms = self.latency_ms + self.jitter_ms * jitter
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+        if failure < self.error_rate:
+            raise StubProviderError("Injected stub provider failure")
+
+
+class StubEmbeddings:
+    """Deterministic embeddings derived from a hash of the input text."""
+
+    def __init__(self, dimensions: int = 1024, latency: Optional[LatencyInjector] = None):
+        self.dimensions = dimensions
+        self.latency = latency or LatencyInjector()
+
+    def create(self, model: str, input: List[str], **kwargs) -> EmbeddingResponse:
+        self.latency("\n".join(input))
+        return EmbeddingResponse(*(self.embed(text).tolist() for text in input))
+
+    def embed(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+        embedding = np.random.default_rng(seed).standard_normal(self.dimensions)
+        return (embedding / np.linalg.norm(embedding)).astype(np.float32)
+
+
+class StubEmbeddingClient:
+    """An embedding client whose `embeddings` is a StubEmbeddings."""
+
+    def __init__(self, dimensions: int = 1024, latency: Optional[LatencyInjector] = None):
+        self.embeddings = StubEmbeddings(dimensions, latency)
+
+
+class StubCompletions:
+    """
+    Mimics the instructor `chat.completions` interface.
+
+    The response model is filled field by field: strings echo the last message,
+    lists get a single item and booleans are True.
+    """
+
+    def __init__(self, latency: Optional[LatencyInjector] = None):
+        self.latency = latency or LatencyInjector()
+
+    def create(self, response_model: Type[BaseModel], messages: List[Dict[str, str]], **kwargs) -> BaseModel:
+        self.latency("\n".join(m["content"] for m in messages))
+        return response_model(**self._fields(response_model, messages))
+
+    def create_partial(
+        self, response_model: Type[BaseModel], messages: List[Dict[str, str]], **kwargs
+    ) -> Iterator[BaseModel]:
+        """Yield partial responses with string fields growing one word at a time."""
+        self.latency("\n".join(m["content"] for m in messages))
+        fields = self._fields(response_model, messages)
+        words = {name: value.split(" ") for name, value in fields.items() if isinstance(value, str)}
+        for count in range(1, max((len(w) for w in words.values()), default=0) + 1):
+            partial = {name: " ".join(value[:count]) for name, value in words.items()}
+            yield response_model.model_construct(**partial)
+        yield response_model(**fields)
+
+    @staticmethod
+    def _fields(response_model: Type[BaseModel], messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        user_messages = [m["content"] for m in messages if m["role"] == "user"]
+        question = user_messages[-1].splitlines()[-1] if user_messages else ""
+        text = f"Stub response to: {question}"
+        fields = {}
+        for name, field in response_model.model_fields.items():
+            annotation = typing.get_origin(field.annotation) or field.annotation
+            if annotation is str:
+                fields[name] = text
+            elif annotation is bool:
+                fields[name] = True
+            elif annotation in (list, List):
+                fields[name] = [text]
+            else:
+                fields[name] = None
+        return fields
+
+
+class StubLLMClient:
+    """An LLM client whose `chat.completions` is a StubCompletions."""
+
+    def __init__(self, latency: Optional[LatencyInjector] = None):
+        self.chat = self
+        self.completions = StubCompletions(latency)
@@ -1,7 +1,7 @@
-from typing import List
+from typing import Dict, Iterator, List
 import pandas as pd
 from pydantic import BaseModel, Field
-from services.llm_factory import LLMFactory
+from services.llm_factory import get_llm_factory
 
 
 class SynthesizedResponse(BaseModel):
@@ -33,6 +33,12 @@ class Synthesizer:
     Review the question from the user:
     """
 
+    NO_CONTEXT_RESPONSE = SynthesizedResponse(
+        thought_process=["No relevant information was retrieved from the knowledge base."],
+        answer="I'm sorry, I couldn't find any information to answer that question.",
+        enough_context=False,
+    )
+
     @staticmethod
     def generate_response(
         question: str,
@@ -47,9 +53,53 @@ class Synthesizer:
 
         Returns:
             A SynthesizedResponse containing thought process and answer.
+            If the context is empty, the LLM is not called at all.
         """
+        if context.empty:
+            return Synthesizer.NO_CONTEXT_RESPONSE.model_copy(deep=True)
+
+        llm = get_llm_factory(llm_client)
+        return llm.create_completion(
+            response_model=SynthesizedResponse,
+            messages=Synthesizer.build_messages(question, context, llm_client),
+        )
+
+    @staticmethod
+    def stream_response(
+        question: str,
+        context: pd.DataFrame,
+        llm_client: str = "bedrock",
+    ) -> Iterator[SynthesizedResponse]:
+        """Streams partially generated responses based on the question and context.
+
+        Args:
+            question: The user's question.
+            context: The relevant context retrieved from the knowledge base.
+
+        Returns:
+            An iterator of increasingly complete SynthesizedResponses; the last one is final.
+            If the context is empty, the LLM is not called at all.
+        """
+        if context.empty:
+            yield Synthesizer.NO_CONTEXT_RESPONSE.model_copy(deep=True)
+            return
+
+        llm = get_llm_factory(llm_client)
+        yield from llm.create_partial_completion(
+            response_model=SynthesizedResponse,
+            messages=Synthesizer.build_messages(question, context, llm_client),
+        )
+
+    @staticmethod
+    def build_messages(
+        question: str,
+        context: pd.DataFrame,
+        llm_client: str,
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages for the question and its retrieved context."""
         context_str = Synthesizer.dataframe_to_json(
-            context, columns_to_keep=["content", "category"]
+            context,
+            columns_to_keep=[c for c in ["content", "category"] if c in context.columns],
         )
 
         if llm_client not in ["bedrock", "anthropic"]:
@@ -72,12 +122,7 @@ class Synthesizer:
             ]
 
         # print(f"Context string: {context_str}")
-
-        llm = LLMFactory(llm_client)
-        return llm.create_completion(
-            response_model=SynthesizedResponse,
-            messages=messages,
-        )
+        return messages
 
     @staticmethod
     def dataframe_to_json(
@@ -3,8 +3,8 @@ import boto3
 
 
 class EmbeddingResponse:
-    def __init__(self, embedding):
-        self.data = [EmbeddingData(embedding)]
+    def __init__(self, *embeddings):
+        self.data = [EmbeddingData(embedding) for embedding in embeddings]
 
 
 class EmbeddingData:
@@ -21,6 +21,7 @@ class TitanEmbeddings(object):
         self.aws_secret_access_key = kwargs.get("aws_secret_access_key")
         self.aws_session_token = kwargs.get("aws_session_token")
         self.region_name = kwargs.get("region_name")
+        self.config = kwargs.get("config")
 
         self.bedrock = boto3.client(
             service_name="bedrock-runtime",
@@ -28,6 +29,7 @@ class TitanEmbeddings(object):
             aws_secret_access_key=self.aws_secret_access_key,
             aws_session_token=self.aws_session_token,
             region_name=self.region_name,
+            config=self.config,
         )
 
         self.model_id = model_id
@@ -35,24 +37,27 @@ class TitanEmbeddings(object):
     def create(self, model, input, dimensions=1024, normalize=True):
         """
         Returns Titan Embeddings
+        Titan takes a single text per request, so each text in `input` is embedded in turn.
         Args:
             model (str): model id to use for embedding
-            input (list): list of text to embed
+            input (list): list of texts to embed
             dimensions (int): Number of output dimensions.
             normalize (bool): Whether to return the normalized embedding or not.
         Return:
             EmbeddingResponse: Embedding response object
 
         """
-        body = json.dumps(
-            {"inputText": input[0], "dimensions": dimensions, "normalize": normalize}
-        )
-        response = self.bedrock.invoke_model(
-            body=body,
-            modelId=model,
-            accept=self.accept,
-            contentType=self.content_type,
-        )
-        response_body = json.loads(response.get("body").read())
-        embedding = response_body["embedding"]
-        return EmbeddingResponse(embedding)
+        embeddings = []
+        for text in input:
+            body = json.dumps(
+                {"inputText": text, "dimensions": dimensions, "normalize": normalize}
+            )
+            response = self.bedrock.invoke_model(
+                body=body,
+                modelId=model,
+                accept=self.accept,
+                contentType=self.content_type,
+            )
+            response_body = json.loads(response.get("body").read())
+            embeddings.append(response_body["embedding"])
+        return EmbeddingResponse(*embeddings)
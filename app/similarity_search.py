@@ -85,7 +85,9 @@ print(f"\nContext: {response.enough_context}")
 
 irrelevant_question = "What is the weather in Tokyo?"
 
-results = vec.search(irrelevant_question, limit=3)
+# Adaptive search drops weak matches, so an irrelevant question retrieves no context
+# and the Synthesizer answers without calling the LLM
+results = vec.search(irrelevant_question, limit=3, adaptive=True)
 
 response = Synthesizer.generate_response(question=irrelevant_question, context=results)
 
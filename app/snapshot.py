@@ -0,0 +1,42 @@
+import argparse
+
+from database.snapshot import export_snapshot, import_snapshot
+from database.vector_store import VectorStore
+
+####################
+# Export the vector table to a snapshot file, or restore it from one, without
+# re-embedding anything.
+#
+# Usage:
+#   python snapshot.py export ../data/embeddings.parquet
+#   python snapshot.py import ../data/embeddings.parquet
+# Use a .arrow file instead of .parquet for a memory-mapped Arrow IPC snapshot.
+####################
+
+parser = argparse.ArgumentParser(description="Export or import vector table snapshots.")
+parser.add_argument("command", choices=["export", "import"])
+parser.add_argument("path", help="Snapshot file (.parquet or .arrow)")
+parser.add_argument("--batch-size", type=int, default=10_000)
+parser.add_argument(
+    "--skip-index",
+    action="store_true",
+    help="Don't build the DiskANN index after importing",
+)
+parser.add_argument(
+    "--from-replica",
+    action="store_true",
+    help="Export from a read replica, which may lag behind the primary",
+)
+args = parser.parse_args()
+
+# Snapshots copy stored embeddings, so no embedding model is needed
+vec = VectorStore(embedding_model_client=None)
+
+if args.command == "export":
+    export_snapshot(
+        vec, args.path, batch_size=args.batch_size, from_replica=args.from_replica
+    )
+else:
+    import_snapshot(
+        vec, args.path, batch_size=args.batch_size, build_index=not args.skip_index
+    )